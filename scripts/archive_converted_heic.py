@@ -6,11 +6,16 @@ This script moves converted HEIC files to an archive directory.
 It identifies HEIC files that have corresponding JPEG files and archives them.
 """
 
+import sys
 import os
-import shutil
 from pathlib import Path
 from datetime import datetime
 
+# Add src directory to path so we can import our modules
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from file_utils import move_file, scandir_files
+
 
 def find_converted_heic_files(src_dir: str, dest_dir: str) -> list:
     """
@@ -28,17 +33,24 @@ def find_converted_heic_files(src_dir: str, dest_dir: str) -> list:
     
     converted_pairs = []
     
-    # Find all HEIC files
-    heic_files = list(src_path.rglob('*.heic'))
-    heic_files.extend(list(src_path.rglob('*.HEIC')))
-    
-    for heic_file in heic_files:
-        # Calculate expected JPEG path
-        rel_path = heic_file.relative_to(src_path)
-        expected_jpeg = dest_path / rel_path.with_suffix('.jpg')
-        
-        if expected_jpeg.exists():
-            converted_pairs.append((heic_file, expected_jpeg))
+    # Index the destination once: relative path without extension -> JPEG path.
+    # Keys are os.path.normcase'd, so they compare case-insensitively on Windows
+    normcase = os.path.normcase
+    dest_prefix_len = len(os.path.join(str(dest_path), ''))
+    jpeg_index = {}
+    for entry in scandir_files(str(dest_path)):
+        stem, ext = os.path.splitext(entry.path[dest_prefix_len:])
+        if ext.lower() == '.jpg':
+            jpeg_index[normcase(stem)] = entry.path
+    
+    # Walk the source once, matching .heic in any letter case
+    src_prefix_len = len(os.path.join(str(src_path), ''))
+    for entry in scandir_files(str(src_path)):
+        if not entry.name.lower().endswith('.heic'):
+            continue
+        expected_jpeg = jpeg_index.get(normcase(os.path.splitext(entry.path[src_prefix_len:])[0]))
+        if expected_jpeg is not None:
+            converted_pairs.append((Path(entry.path), Path(expected_jpeg)))
     
     return converted_pairs
 
@@ -71,18 +83,22 @@ def archive_heic_files(converted_pairs: list, archive_dir: str, dry_run: bool =
     
     print(f"\nArchiving {len(converted_pairs)} HEIC files...")
     
+    # Work out every archive location first so each directory is created once
+    archive_dests = []
     for heic_file, jpeg_file in converted_pairs:
+        src_root = heic_file.parents[len(heic_file.parents) - 2]  # Get original source root
+        archive_dests.append(archive_path / heic_file.relative_to(src_root))
+    for parent in {archive_dest.parent for archive_dest in archive_dests}:
+        try:
+            parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            # Its files then fail to move and are recorded one by one below
+            print(f"Error creating {parent}: {e}")
+    
+    for (heic_file, jpeg_file), archive_dest in zip(converted_pairs, archive_dests):
         try:
-            # Create archive subdirectory structure
-            src_root = heic_file.parents[len(heic_file.parents) - 2]  # Get original source root
-            rel_path = heic_file.relative_to(src_root)
-            archive_dest = archive_path / rel_path
-            
-            # Create destination directory
-            archive_dest.parent.mkdir(parents=True, exist_ok=True)
-            
             # Move the HEIC file
-            shutil.move(str(heic_file), str(archive_dest))
+            move_file(heic_file, archive_dest)
             
             results['archived'].append({
                 'original': str(heic_file),
@@ -8,6 +8,7 @@ Use this for non-HEIC images after running media scanning.
 
 import sys
 import os
+import argparse
 from pathlib import Path
 
 # Add src directory to path so we can import our modules
@@ -16,7 +17,7 @@ sys.path.append(str(Path(__file__).parent.parent / "src"))
 from main import ImageConverter
 
 
-def main():
+def main(progressive: bool = True, allow_slow_jpeg: bool = False):
     """Convert general image files to JPEG."""
     
     # Define your source and destination directories
@@ -30,7 +31,8 @@ def main():
     
     try:
         # Initialize the converter
-        converter = ImageConverter(src_directory, dest_directory)
+        converter = ImageConverter(src_directory, dest_directory, progressive=progressive,
+                                   allow_slow_jpeg=allow_slow_jpeg)
         
         # Step 1: Show what would be converted (dry run)
         print("\n1. Dry run - showing what files would be converted...")
@@ -58,14 +60,15 @@ def main():
         print(f"An error occurred: {e}")
 
 
-def convert_specific_month():
+def convert_specific_month(progressive: bool = True, allow_slow_jpeg: bool = False):
     """Convert images from a specific year and month."""
     
     src_directory = r'W:\Organized'
     dest_directory = r'W:\Convert to Jpeg'
     
     try:
-        converter = ImageConverter(src_directory, dest_directory)
+        converter = ImageConverter(src_directory, dest_directory, progressive=progressive,
+                                   allow_slow_jpeg=allow_slow_jpeg)
         
         print("\n" + "=" * 60)
         print("CONVERT SPECIFIC MONTH")
@@ -91,6 +94,13 @@ def convert_specific_month():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert general image files to JPEG')
+    parser.add_argument('--baseline', action='store_true',
+                        help='Write baseline (non-progressive) JPEGs')
+    parser.add_argument('--allow-slow-jpeg', action='store_true',
+                        help='Run even if Pillow lacks libjpeg-turbo')
+    args = parser.parse_args()
+
     print("Choose an option:")
     print("1. Convert all supported files")
     print("2. Convert specific month")
@@ -98,8 +108,9 @@ if __name__ == "__main__":
     choice = input("Enter choice (1 or 2): ").strip()
     
     if choice == "1":
-        main()
+        main(progressive=not args.baseline, allow_slow_jpeg=args.allow_slow_jpeg)
     elif choice == "2":
-        convert_specific_month()
+        convert_specific_month(progressive=not args.baseline,
+                               allow_slow_jpeg=args.allow_slow_jpeg)
     else:
         print("Invalid choice. Please run the script again and choose 1 or 2.")
@@ -11,16 +11,32 @@ This script handles post-conversion tasks:
 
 import sys
 import os
-import shutil
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Set, Tuple, Optional
 import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 
 # Add src directory to path so we can import our modules
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
 from heic_converter import HeicConverter
+from file_utils import move_file, scandir_files
+
+# Columns of the converted_files tracking table after heic_path
+_TRACKING_FIELDS = ('jpeg_path', 'archive_path', 'archived_date', 'original_size', 'jpeg_size')
+# PRAGMA user_version once the legacy conversion_tracking.json has been imported
+_SCHEMA_VERSION = 1
+
+
+def _move_heic(heic_path: Path, archive_path: Path):
+    """Move one HEIC file into the archive; returns the exception instead of raising it."""
+    try:
+        move_file(heic_path, archive_path)
+    except Exception as e:
+        return e
+    return None
 
 
 class HeicArchiveManager:
@@ -34,29 +50,177 @@ class HeicArchiveManager:
         # Create archive directory if it doesn't exist
         self.archive_dir.mkdir(parents=True, exist_ok=True)
         
+        # String forms for the per-file loops, which slice paths instead of building Paths
+        self._src_prefix = os.path.join(str(self.src_dir), '')
+        self._src_prefix_len = len(self._src_prefix)
+        self._dest_prefix_len = len(os.path.join(str(self.dest_dir), ''))
+        self._archive_str = str(self.archive_dir)
+        
         # Reports directory
         self.reports_dir = Path(__file__).parent.parent / "reports"
         self.reports_dir.mkdir(exist_ok=True)
         
-        # Conversion tracking file
+        # Conversion tracking database; the JSON file is only read to migrate older setups
+        self.tracking_db = self.reports_dir / "conversion_tracking.db"
         self.tracking_file = self.reports_dir / "conversion_tracking.json"
+        # Archive history is append-only, so it lives in a JSON Lines sidecar
+        self.history_file = self.reports_dir / "archive_history.jsonl"
         self.load_tracking_data()
+        
+        # HEIC entries from the last walk of src_dir, reused until files move
+        self._heic_cache = None
+        # Relative stem -> JPEG DirEntry from the last walk of dest_dir
+        self._jpeg_index = None
+        # Last reconcile_conversions summary, valid until the caches above are dropped
+        self._reconcile_cache = None
+        # Directories already created, so repeated parents skip the mkdir syscalls
+        self._created_dirs = set()
     
     def load_tracking_data(self):
-        """Load the conversion tracking data."""
-        if self.tracking_file.exists():
-            with open(self.tracking_file, 'r') as f:
-                self.tracking_data = json.load(f)
-        else:
-            self.tracking_data = {
-                'converted_files': {},  # heic_path: {jpeg_path, archive_path, date}
-                'archive_history': []
+        """
+        Load the conversion tracking data from SQLite, so archive and restore
+        runs write only the rows they change instead of rewriting everything.
+        """
+        self._db = sqlite3.connect(self.tracking_db)
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS converted_files ('
+            'heic_path TEXT PRIMARY KEY, jpeg_path TEXT, archive_path TEXT, '
+            'archived_date TEXT, original_size INTEGER, jpeg_size INTEGER)'
+        )
+        # user_version marks that the legacy JSON has been imported (or there was none),
+        # so a failed migration is retried on the next run instead of being skipped
+        if self._db.execute('PRAGMA user_version').fetchone()[0] < _SCHEMA_VERSION:
+            self._migrate_json_tracking()
+        
+        columns = ', '.join(_TRACKING_FIELDS)
+        self.tracking_data = {
+            'converted_files': {  # heic_path: {jpeg_path, archive_path, date}
+                row[0]: dict(zip(_TRACKING_FIELDS, row[1:]))
+                for row in self._db.execute(f'SELECT heic_path, {columns} FROM converted_files')
             }
+        }
+        
+        # Lowercased file name -> tracked original paths, so restores skip a linear scan
+        self._basename_index = {}
+        for original_path in self.tracking_data['converted_files']:
+            self._basename_index.setdefault(Path(original_path).name.lower(), []).append(original_path)
     
-    def save_tracking_data(self):
-        """Save the conversion tracking data."""
-        with open(self.tracking_file, 'w') as f:
-            json.dump(self.tracking_data, f, indent=2)
+    def _migrate_json_tracking(self):
+        """
+        Copy records from the old conversion_tracking.json into the database.
+        Rows and the user_version marker are committed together; the history
+        sidecar is only written after that commit, and the JSON is then renamed
+        to .migrated so it is never imported twice.
+        """
+        if not self.tracking_file.exists():
+            with self._db:
+                self._db.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+            return
+        
+        try:
+            with open(self.tracking_file, 'r') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not migrate {self.tracking_file} ({e}); "
+                  f"it will be retried on the next run")
+            return
+        
+        # A database filled before the marker existed already holds these rows and history
+        already_imported = self._db.execute('SELECT 1 FROM converted_files LIMIT 1').fetchone() is not None
+        with self._db:
+            if not already_imported:
+                # Rows written by this tool win over the legacy copy
+                self._db.executemany(
+                    'INSERT OR IGNORE INTO converted_files VALUES (?, ?, ?, ?, ?, ?)',
+                    ((heic_path, *(info.get(field) for field in _TRACKING_FIELDS))
+                     for heic_path, info in legacy.get('converted_files', {}).items())
+                )
+            self._db.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+        
+        # History kept inside older tracking files moves to the sidecar
+        if not already_imported and legacy.get('archive_history'):
+            with open(self.history_file, 'a') as hf:
+                for record in legacy['archive_history']:
+                    hf.write(json.dumps(record) + '\n')
+        
+        os.replace(self.tracking_file, self.tracking_file.with_name(self.tracking_file.name + '.migrated'))
+        print(f"Migrated conversion tracking from {self.tracking_file} to {self.tracking_db}")
+    
+    def close(self):
+        """Close the tracking database connection."""
+        self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def save_tracking_data(self, heic_paths: List[str]):
+        """Write the tracking records for heic_paths in a single transaction."""
+        converted_files = self.tracking_data['converted_files']
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO converted_files VALUES (?, ?, ?, ?, ?, ?)',
+                ((heic_path, *(converted_files[heic_path][field] for field in _TRACKING_FIELDS))
+                 for heic_path in heic_paths)
+            )
+    
+    def _archive_path(self, heic_path) -> str:
+        """Return the archive location of a HEIC file under src_dir, as a string."""
+        return os.path.join(self._archive_str, self._relative(str(heic_path)))
+    
+    def _relative(self, path_str: str) -> str:
+        """Return path_str relative to src_dir; a string slice in place of Path.relative_to."""
+        if not path_str.startswith(self._src_prefix):
+            raise ValueError(f"{path_str} is not under {self.src_dir}")
+        return path_str[self._src_prefix_len:]
+    
+    def _ensure_dir(self, path: Path):
+        """Create path (and parents) unless this manager already did."""
+        if path in self._created_dirs:
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        self._created_dirs.add(path)
+    
+    def read_history(self):
+        """Yield each archive history record, oldest first."""
+        if not self.history_file.exists():
+            return
+        with open(self.history_file, 'r') as hf:
+            for line in hf:
+                if line.strip():
+                    yield json.loads(line)
+    
+    def _iter_heic(self):
+        """Yield an os.DirEntry for every .heic file (any case) under src_dir in one os.scandir walk."""
+        for entry in scandir_files(str(self.src_dir)):
+            # Lowercasing just the last five characters matches .heic in any case
+            if entry.name[-5:].lower() == '.heic':
+                yield entry
+    
+    def _heic_entries(self) -> List[os.DirEntry]:
+        """Return the HEIC entries under src_dir, walking the tree only on first use."""
+        if self._heic_cache is None:
+            self._heic_cache = list(self._iter_heic())
+        return self._heic_cache
+    
+    def _build_jpeg_index(self) -> Dict[str, os.DirEntry]:
+        """
+        Walk dest_dir once and map each JPEG's relative path without extension
+        (.jpg or .jpeg, any case) to its DirEntry, so pairing needs no stat per HEIC.
+        Keys are os.path.normcase'd, so they compare case-insensitively on Windows.
+        """
+        if self._jpeg_index is None:
+            dest_prefix_len = self._dest_prefix_len
+            normcase = os.path.normcase
+            self._jpeg_index = {}
+            for entry in scandir_files(str(self.dest_dir)):
+                stem, ext = os.path.splitext(entry.path[dest_prefix_len:])
+                if ext.lower() in ('.jpg', '.jpeg'):
+                    self._jpeg_index[normcase(stem)] = entry
+        return self._jpeg_index
     
     def find_converted_pairs(self) -> List[Dict]:
         """
@@ -64,70 +228,104 @@ class HeicArchiveManager:
         Returns list of dictionaries with file pair information.
         """
         converted_pairs = []
-        
-        # Find all HEIC files in source
-        heic_files = list(self.src_dir.rglob('*.heic'))
-        heic_files.extend(list(self.src_dir.rglob('*.HEIC')))
-        
-        for heic_path in heic_files:
-            # Calculate expected JPEG path
-            rel_path = heic_path.relative_to(self.src_dir)
-            expected_jpeg = self.dest_dir / rel_path.with_suffix('.jpg')
+        jpeg_index = self._build_jpeg_index()
+        src_prefix_len = self._src_prefix_len
+        normcase = os.path.normcase
+        splitext = os.path.splitext
+        converted_files = self.tracking_data['converted_files']
+        
+        # Hash join of the two walks on the relative path without extension
+        for entry in self._heic_entries():
+            jpeg_entry = jpeg_index.get(normcase(splitext(entry.path[src_prefix_len:])[0]))
             
-            if expected_jpeg.exists():
+            if jpeg_entry is not None:
                 # Check if already tracked
-                heic_str = str(heic_path)
-                already_archived = heic_str in self.tracking_data['converted_files']
+                heic_str = entry.path
+                already_archived = heic_str in converted_files
                 
+                # Sizes of archived files are already tracked; otherwise use the
+                # DirEntry stat, which Windows fills in from the directory listing
+                archive_info = converted_files[heic_str] if already_archived else {}
+                heic_size = archive_info.get('original_size')
+                if heic_size is None:
+                    heic_size = entry.stat().st_size
+                jpeg_size = archive_info.get('jpeg_size')
+                if jpeg_size is None:
+                    jpeg_size = jpeg_entry.stat().st_size
+                
+                # Paths are only built here, for the callers and reports
                 pair_info = {
-                    'heic_path': heic_path,
-                    'jpeg_path': expected_jpeg,
+                    'heic_path': Path(heic_str),
+                    'jpeg_path': Path(jpeg_entry.path),
                     'already_archived': already_archived,
-                    'heic_size': heic_path.stat().st_size,
-                    'jpeg_size': expected_jpeg.stat().st_size,
+                    'heic_size': heic_size,
+                    'jpeg_size': jpeg_size,
                     'conversion_verified': True
                 }
                 
                 if already_archived:
-                    pair_info['archive_info'] = self.tracking_data['converted_files'][heic_str]
+                    pair_info['archive_info'] = archive_info
                 
                 converted_pairs.append(pair_info)
         
         return converted_pairs
     
-    def reconcile_conversions(self, save_report: bool = True) -> Dict:
+    def _invalidate_scans(self):
+        """Forget cached walks and reconciliation after files move."""
+        self._heic_cache = None
+        self._jpeg_index = None
+        self._reconcile_cache = None
+    
+    def reconcile_conversions(self, save_report: bool = False, force_refresh: bool = False) -> Dict:
         """
         Reconcile HEIC files with their JPEG counterparts.
-        Returns summary of reconciliation results.
+        Returns summary of reconciliation results; repeated calls reuse the last
+        summary until this manager moves files or force_refresh rescans the trees.
         """
+        if force_refresh:
+            self._invalidate_scans()
+        
+        if self._reconcile_cache is not None:
+            if save_report:
+                self._save_reconciliation_report(self._reconcile_cache)
+            return self._reconcile_cache
+        
         print("Scanning for converted HEIC/JPEG pairs...")
         
         converted_pairs = self.find_converted_pairs()
+        already_archived = sum(1 for p in converted_pairs if p['already_archived'])
         
         summary = {
-            'total_heic_files': len(list(self.src_dir.rglob('*.heic'))) + len(list(self.src_dir.rglob('*.HEIC'))),
+            # Counted from the same cached walk find_converted_pairs used
+            'total_heic_files': len(self._heic_entries()),
             'converted_pairs': len(converted_pairs),
-            'already_archived': len([p for p in converted_pairs if p['already_archived']]),
-            'ready_for_archive': len([p for p in converted_pairs if not p['already_archived']]),
+            'already_archived': already_archived,
+            'ready_for_archive': len(converted_pairs) - already_archived,
             'pairs': converted_pairs
         }
         
+        self._reconcile_cache = summary
+        
         if save_report:
             self._save_reconciliation_report(summary)
         
         return summary
     
-    def archive_converted_heic_files(self, dry_run: bool = False) -> Dict:
+    def archive_converted_heic_files(self, dry_run: bool = False, max_workers: int = 16,
+                                     verbose: Optional[bool] = None) -> Dict:
         """
         Move converted HEIC files to archive directory.
         
         Args:
             dry_run: If True, only show what would be archived
+            max_workers: Number of moves to run at once
+            verbose: Print a line per archived file; defaults to True only when
+                stdout is a terminal, so batch runs print just errors and the summary
         
         Returns:
             Archive operation results
         """
-        reconcile_results = self.reconcile_conversions(save_report=False)
+        reconcile_results = self.reconcile_conversions()
         ready_for_archive = [p for p in reconcile_results['pairs'] if not p['already_archived']]
         
         if not ready_for_archive:
@@ -137,9 +335,7 @@ class HeicArchiveManager:
         if dry_run:
             print(f"\nDry Run: Would archive {len(ready_for_archive)} HEIC files:")
             for pair in ready_for_archive:
-                rel_path = pair['heic_path'].relative_to(self.src_dir)
-                archive_path = self.archive_dir / rel_path
-                print(f"  {pair['heic_path']} -> {archive_path}")
+                print(f"  {pair['heic_path']} -> {self._archive_path(pair['heic_path'])}")
             return {'archived': [], 'skipped': ready_for_archive, 'errors': []}
         
         # Actual archiving
@@ -147,51 +343,63 @@ class HeicArchiveManager:
         
         print(f"\nArchiving {len(ready_for_archive)} converted HEIC files...")
         
-        for pair in ready_for_archive:
+        # Work out every archive location first so each directory is created once
+        archive_paths = [self._archive_path(pair['heic_path']) for pair in ready_for_archive]
+        for parent in {os.path.dirname(archive_path) for archive_path in archive_paths}:
             try:
-                heic_path = pair['heic_path']
-                rel_path = heic_path.relative_to(self.src_dir)
-                archive_path = self.archive_dir / rel_path
-                
-                # Create archive directory structure
-                archive_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Move the HEIC file
-                shutil.move(str(heic_path), str(archive_path))
+                self._ensure_dir(Path(parent))
+            except OSError as e:
+                print(f"Error creating {parent}: {e}")
+        
+        # Moves are metadata round trips on the share, so overlap them in threads;
+        # tracking and history are updated here on the main thread in order
+        heic_paths = [pair['heic_path'] for pair in ready_for_archive]
+        if verbose is None:
+            verbose = sys.stdout.isatty()
+        with open(self.history_file, 'a') as history, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            moves = executor.map(_move_heic, heic_paths, archive_paths)
+            for pair, archive_path, error in zip(ready_for_archive, archive_paths, moves):
+                heic_path = str(pair['heic_path'])
+                if error is not None:
+                    results['errors'].append({
+                        'heic_path': heic_path,
+                        'error': str(error)
+                    })
+                    print(f"Error archiving {heic_path}: {error}")
+                    continue
                 
                 # Update tracking data
-                self.tracking_data['converted_files'][str(heic_path)] = {
+                if heic_path not in self.tracking_data['converted_files']:
+                    self._basename_index.setdefault(os.path.basename(heic_path).lower(), []).append(heic_path)
+                self.tracking_data['converted_files'][heic_path] = {
                     'jpeg_path': str(pair['jpeg_path']),
-                    'archive_path': str(archive_path),
+                    'archive_path': archive_path,
                     'archived_date': datetime.now().isoformat(),
                     'original_size': pair['heic_size'],
                     'jpeg_size': pair['jpeg_size']
                 }
                 
-                self.tracking_data['archive_history'].append({
-                    'heic_path': str(heic_path),
-                    'archive_path': str(archive_path),
+                history.write(json.dumps({
+                    'heic_path': heic_path,
+                    'archive_path': archive_path,
                     'archived_date': datetime.now().isoformat()
-                })
+                }) + '\n')
                 
                 results['archived'].append({
-                    'heic_path': str(heic_path),
-                    'archive_path': str(archive_path),
+                    'heic_path': heic_path,
+                    'archive_path': archive_path,
                     'jpeg_path': str(pair['jpeg_path'])
                 })
                 
-                print(f"Archived: {heic_path} -> {archive_path}")
-                
-            except Exception as e:
-                error_info = {
-                    'heic_path': str(pair['heic_path']),
-                    'error': str(e)
-                }
-                results['errors'].append(error_info)
-                print(f"Error archiving {pair['heic_path']}: {e}")
+                if verbose:
+                    print(f"Archived: {heic_path} -> {archive_path}")
+        
+        # HEIC files have moved, so the cached walks are stale
+        self._invalidate_scans()
         
-        # Save tracking data
-        self.save_tracking_data()
+        # Save tracking data for the files archived in this run
+        self.save_tracking_data([item['heic_path'] for item in results['archived']])
         
         # Save archive report
         self._save_archive_report(results)
@@ -213,32 +421,47 @@ class HeicArchiveManager:
             True if successful, False otherwise
         """
         # Find the file in tracking data
-        for original_path, archive_info in self.tracking_data['converted_files'].items():
-            if Path(original_path).name.lower() == heic_filename.lower():
-                archive_path = Path(archive_info['archive_path'])
-                
-                if archive_path.exists():
-                    try:
-                        # Move back to original location
-                        original_path_obj = Path(original_path)
-                        original_path_obj.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.move(str(archive_path), str(original_path_obj))
-                        
-                        # Remove from tracking
-                        del self.tracking_data['converted_files'][original_path]
-                        self.save_tracking_data()
-                        
-                        print(f"Restored: {archive_path} -> {original_path_obj}")
-                        return True
-                    except Exception as e:
-                        print(f"Error restoring {heic_filename}: {e}")
-                        return False
-                else:
-                    print(f"Archive file not found: {archive_path}")
-                    return False
-        
-        print(f"No archive record found for: {heic_filename}")
-        return False
+        original_paths = self._basename_index.get(heic_filename.lower())
+        if not original_paths:
+            print(f"No archive record found for: {heic_filename}")
+            return False
+        
+        original_path = original_paths[0]
+        archive_path = Path(self.tracking_data['converted_files'][original_path]['archive_path'])
+        
+        if not archive_path.exists():
+            print(f"Archive file not found: {archive_path}")
+            return False
+        
+        try:
+            # Move back to original location
+            original_path_obj = Path(original_path)
+            try:
+                move_file(archive_path, original_path_obj)
+            except FileNotFoundError:
+                # The archive file exists, so it is the original folder that is gone
+                self._ensure_dir(original_path_obj.parent)
+                move_file(archive_path, original_path_obj)
+            
+            self._invalidate_scans()
+            
+            # Remove from tracking
+            del self.tracking_data['converted_files'][original_path]
+            original_paths.pop(0)
+            if not original_paths:
+                del self._basename_index[heic_filename.lower()]
+            with self._db:
+                self._db.execute('DELETE FROM converted_files WHERE heic_path = ?', (original_path,))
+            
+            print(f"Restored: {archive_path} -> {original_path_obj}")
+            return True
+        except Exception as e:
+            print(f"Error restoring {heic_filename}: {e}")
+            return False
+    
+    def generate_report(self):
+        """Write the reconciliation report for the current (cached) reconciliation."""
+        self._save_reconciliation_report(self.reconcile_conversions())
     
     def _save_reconciliation_report(self, summary: Dict):
         """Save reconciliation report."""
@@ -257,15 +480,18 @@ class HeicArchiveManager:
             
             f.write("Converted Pairs:\n")
             f.write("-" * 30 + "\n")
-            for pair in summary['pairs']:
-                f.write(f"HEIC: {pair['heic_path']}\n")
-                f.write(f"JPEG: {pair['jpeg_path']}\n")
-                f.write(f"Already Archived: {pair['already_archived']}\n")
-                f.write(f"HEIC Size: {pair['heic_size']:,} bytes\n")
-                f.write(f"JPEG Size: {pair['jpeg_size']:,} bytes\n")
-                if pair['already_archived']:
-                    f.write(f"Archive Info: {pair['archive_info']}\n")
-                f.write("-" * 30 + "\n")
+            # One formatted block per pair, streamed so the report is never built in memory
+            separator = "-" * 30 + "\n"
+            f.writelines(
+                f"HEIC: {pair['heic_path']}\n"
+                f"JPEG: {pair['jpeg_path']}\n"
+                f"Already Archived: {pair['already_archived']}\n"
+                f"HEIC Size: {pair['heic_size']:,} bytes\n"
+                f"JPEG Size: {pair['jpeg_size']:,} bytes\n"
+                + (f"Archive Info: {pair['archive_info']}\n" if pair['already_archived'] else "")
+                + separator
+                for pair in summary['pairs']
+            )
         
         print(f"Reconciliation report saved to: {report_file}")
     
@@ -281,19 +507,22 @@ class HeicArchiveManager:
             
             f.write(f"Successfully Archived ({len(results['archived'])}):\n")
             f.write("-" * 30 + "\n")
-            for item in results['archived']:
-                f.write(f"Original: {item['heic_path']}\n")
-                f.write(f"Archive: {item['archive_path']}\n")
-                f.write(f"JPEG: {item['jpeg_path']}\n")
-                f.write("-" * 30 + "\n")
+            separator = "-" * 30 + "\n"
+            f.writelines(
+                f"Original: {item['heic_path']}\n"
+                f"Archive: {item['archive_path']}\n"
+                f"JPEG: {item['jpeg_path']}\n" + separator
+                for item in results['archived']
+            )
             
             if results['errors']:
                 f.write(f"\nArchive Errors ({len(results['errors'])}):\n")
                 f.write("-" * 30 + "\n")
-                for error in results['errors']:
-                    f.write(f"File: {error['heic_path']}\n")
-                    f.write(f"Error: {error['error']}\n")
-                    f.write("-" * 30 + "\n")
+                f.writelines(
+                    f"File: {error['heic_path']}\n"
+                    f"Error: {error['error']}\n" + separator
+                    for error in results['errors']
+                )
         
         print(f"Archive report saved to: {report_file}")
 
@@ -312,35 +541,35 @@ def main():
     print("=" * 60)
     
     try:
-        # Create archive manager
-        manager = HeicArchiveManager(src_directory, dest_directory, archive_directory)
-        
-        # Step 1: Reconcile conversions
-        print("\n1. Reconciling HEIC files with JPEG conversions...")
-        reconcile_results = manager.reconcile_conversions()
-        
-        print(f"\nReconciliation Summary:")
-        print(f"  Total HEIC files: {reconcile_results['total_heic_files']}")
-        print(f"  Converted pairs: {reconcile_results['converted_pairs']}")
-        print(f"  Already archived: {reconcile_results['already_archived']}")
-        print(f"  Ready for archive: {reconcile_results['ready_for_archive']}")
-        
-        if reconcile_results['ready_for_archive'] == 0:
-            print("\nNo files ready for archiving.")
-            return
-        
-        # Step 2: Show what would be archived (dry run)
-        print(f"\n2. Dry run - showing what would be archived...")
-        manager.archive_converted_heic_files(dry_run=True)
-        
-        # Step 3: Confirm archiving
-        response = input(f"\nDo you want to archive {reconcile_results['ready_for_archive']} HEIC files? (y/N): ")
-        if response.lower() == 'y':
-            print("\n3. Archiving converted HEIC files...")
-            archive_results = manager.archive_converted_heic_files(dry_run=False)
-            print("\nArchiving completed successfully!")
-        else:
-            print("Archiving cancelled.")
+        # Create archive manager; the with block closes its tracking database
+        with HeicArchiveManager(src_directory, dest_directory, archive_directory) as manager:
+            # Step 1: Reconcile conversions
+            print("\n1. Reconciling HEIC files with JPEG conversions...")
+            reconcile_results = manager.reconcile_conversions()
+        
+            print(f"\nReconciliation Summary:")
+            print(f"  Total HEIC files: {reconcile_results['total_heic_files']}")
+            print(f"  Converted pairs: {reconcile_results['converted_pairs']}")
+            print(f"  Already archived: {reconcile_results['already_archived']}")
+            print(f"  Ready for archive: {reconcile_results['ready_for_archive']}")
+            manager.generate_report()
+        
+            if reconcile_results['ready_for_archive'] == 0:
+                print("\nNo files ready for archiving.")
+                return
+        
+            # Step 2: Show what would be archived (dry run)
+            print(f"\n2. Dry run - showing what would be archived...")
+            manager.archive_converted_heic_files(dry_run=True)
+        
+            # Step 3: Confirm archiving
+            response = input(f"\nDo you want to archive {reconcile_results['ready_for_archive']} HEIC files? (y/N): ")
+            if response.lower() == 'y':
+                print("\n3. Archiving converted HEIC files...")
+                archive_results = manager.archive_converted_heic_files(dry_run=False)
+                print("\nArchiving completed successfully!")
+            else:
+                print("Archiving cancelled.")
     
     except Exception as e:
         print(f"Error: {e}")
@@ -8,6 +8,7 @@ It scans for HEIC files, validates they have creation dates, and converts them s
 
 import sys
 import os
+import argparse
 from pathlib import Path
 
 # Add src directory to path so we can import our modules
@@ -16,7 +17,7 @@ sys.path.append(str(Path(__file__).parent.parent / "src"))
 from heic_converter import HeicConverter
 
 
-def main():
+def main(allow_slow_jpeg: bool = False):
     """Convert HEIC files with EXIF validation."""
     
     # Define your source and destination directories
@@ -30,7 +31,7 @@ def main():
     
     try:
         # Create HEIC converter
-        heic_converter = HeicConverter(src_directory, dest_directory)
+        heic_converter = HeicConverter(src_directory, dest_directory, allow_slow_jpeg=allow_slow_jpeg)
         
         # Step 1: Scan HEIC files for EXIF validation
         print("\n1. Scanning HEIC files for EXIF validation...")
@@ -79,4 +80,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Convert HEIC files to JPEG with EXIF validation')
+    parser.add_argument('--allow-slow-jpeg', action='store_true',
+                        help='Run even if Pillow lacks libjpeg-turbo')
+    args = parser.parse_args()
+
+    main(allow_slow_jpeg=args.allow_slow_jpeg)
@@ -10,33 +10,154 @@ This script compares HEIC files with their converted JPEG counterparts to:
 """
 
 import os
+import heapq
+import json
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
+HEIC_SUFFIXES = frozenset({'.heic'})
+# Conversion only writes .jpg, so only those can pair; .jpeg files are always orphans
+JPEG_SUFFIXES = frozenset({'.jpg', '.jpeg'})
 
-def analyze_conversion_status(src_dir: str, dest_dir: str) -> dict:
+
+def _scan_tree(root: str, suffixes: frozenset, cached_dirs: dict):
+    """
+    Walk root with os.scandir and return ({dir path: [dir st_mtime_ns, subdir names,
+    [[file name, size, mtime, lowercase suffix], ...]]}, set of reused dir paths),
+    keeping only files whose suffix is in suffixes. A directory whose mtime matches
+    its cached_dirs entry is not listed again; its cached subdirs and files are reused
+    instead. Adding, removing or renaming a file changes its directory's mtime, but
+    rewriting one in place does not, so rows from reused directories may be stale;
+    see _refresh_row.
+    """
+    dirs = {}
+    reused = set()
+    stack = [root]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            dir_mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            continue
+        cached = cached_dirs.get(dir_path)
+        if cached is not None and cached[0] == dir_mtime_ns:
+            subdirs, files = cached[1], cached[2]
+            reused.add(dir_path)
+        else:
+            subdirs = []
+            files = []
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            suffix = os.path.splitext(entry.name)[1].lower()
+                            if suffix in suffixes:
+                                stat = entry.stat()
+                                files.append([entry.name, stat.st_size, stat.st_mtime, suffix])
+            except PermissionError:
+                continue
+        dirs[dir_path] = [dir_mtime_ns, subdirs, files]
+        stack.extend(os.path.join(dir_path, name) for name in subdirs)
+    return dirs, reused
+
+
+def _iter_scanned_files(dirs: dict):
+    """Yield (dir path, file path, row) for every file row recorded by _scan_tree."""
+    for dir_path, (_, _, files) in dirs.items():
+        for row in files:
+            yield dir_path, os.path.join(dir_path, row[0]), row
+
+
+def _refresh_row(path: str, row: list):
+    """Re-stat a file listed from a cached directory and update its row if it was rewritten in place."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return
+    if stat.st_size != row[1] or stat.st_mtime != row[2]:
+        row[1] = stat.st_size
+        row[2] = stat.st_mtime
+
+
+def _load_scan_state(state_dir: str, src_dir: str, dest_dir: str) -> dict:
+    """Load the newest state_*.json in state_dir if it was written for the same directories."""
+    state_files = sorted(Path(state_dir).glob("state_*.json"))
+    if not state_files:
+        return {}
+    try:
+        with open(state_files[-1], 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get('src_dir') != str(src_dir) or state.get('dest_dir') != str(dest_dir):
+        return {}
+    return state
+
+
+def _save_scan_state(state_dir: str, state: dict):
+    """Write the directory scan state as state_<timestamp>.json in state_dir, replacing older ones."""
+    state_path = Path(state_dir)
+    state_path.mkdir(exist_ok=True)
+    previous = list(state_path.glob("state_*.json"))
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    state_file = state_path / f"state_{timestamp}.json"
+    # Write beside the final name and rename, so an interrupted run never leaves a truncated state
+    tmp_file = state_file.with_name(state_file.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, state_file)
+    for old_file in previous:
+        if old_file != state_file:
+            old_file.unlink()
+
+
+def analyze_conversion_status(src_dir: str, dest_dir: str, state_dir: str = None) -> dict:
     """
     Analyze the conversion status between HEIC and JPEG files.
     
     Args:
         src_dir: Source directory containing HEIC files
         dest_dir: Destination directory containing JPEG files
+        state_dir: If given, directory listings are cached there as state_*.json and
+            only directories whose mtime changed since the newest one are re-listed
     
     Returns:
         Dictionary with analysis results
     """
-    src_path = Path(src_dir)
-    dest_path = Path(dest_dir)
+    # Files are matched on their relative path without suffix, normcase'd so that
+    # matching is case-insensitive on Windows like the filesystem itself
+    normcase = os.path.normcase
     
-    # Find all HEIC files
-    heic_files = set()
-    for pattern in ['*.heic', '*.HEIC']:
-        heic_files.update(src_path.rglob(pattern))
+    state = _load_scan_state(state_dir, src_dir, dest_dir) if state_dir else {}
     
-    # Find all JPEG files in destination
-    jpeg_files = set()
-    for pattern in ['*.jpg', '*.jpeg', '*.JPG', '*.JPEG']:
-        jpeg_files.update(dest_path.rglob(pattern))
+    # The two walks are independent and I/O-bound, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        src_scan = executor.submit(_scan_tree, str(src_dir), HEIC_SUFFIXES, state.get('src', {}))
+        dest_scan = executor.submit(_scan_tree, str(dest_dir), JPEG_SUFFIXES, state.get('dest', {}))
+        src_dirs, src_reused = src_scan.result()
+        dest_dirs, dest_reused = dest_scan.result()
+    
+    # Find all HEIC files: (match key, path, row, listed from cache). Keys are plain
+    # string slices; the suffix is already known, so its length is simply cut off the end.
+    src_prefix_len = len(os.path.join(str(src_dir), ''))
+    heic_entries = [(normcase(path[src_prefix_len:-len(row[3])]), path, row, dir_path in src_reused)
+                    for dir_path, path, row in _iter_scanned_files(src_dirs)]
+    
+    # Find all JPEG files in destination: (match key, path, row), with
+    # .jpeg files keyed None since conversion only ever writes .jpg
+    dest_prefix_len = len(os.path.join(str(dest_dir), ''))
+    jpeg_entries = []
+    jpeg_index = {}
+    for dir_path, path, row in _iter_scanned_files(dest_dirs):
+        if row[3] == '.jpg':
+            key = normcase(path[dest_prefix_len:-4])
+            jpeg_index[key] = (path, row, dir_path in dest_reused)
+        else:
+            key = None
+        jpeg_entries.append((key, path, row))
     
     # Analysis results
     results = {
@@ -46,57 +167,74 @@ def analyze_conversion_status(src_dir: str, dest_dir: str) -> dict:
         'summary': {}
     }
     
-    # Track which JPEG files have corresponding HEIC
-    matched_jpegs = set()
+    # Track the keys of JPEG files that have a corresponding HEIC
+    matched_keys = set()
+    
+    # Running totals for the summary, kept during the pairing loop
+    total_heic_size = 0
+    total_jpeg_size = 0
+    total_reduction = 0.0
     
-    # Check each HEIC file for corresponding JPEG
-    for heic_file in heic_files:
-        # Calculate expected JPEG path
-        rel_path = heic_file.relative_to(src_path)
-        expected_jpeg = dest_path / rel_path.with_suffix('.jpg')
+    # Check each HEIC file for corresponding JPEG. Sizes and modification times
+    # come from the walk; mtimes stay raw timestamps until the report.
+    for key, heic_path, heic_row, heic_from_cache in heic_entries:
+        jpeg = jpeg_index.get(key)
         
-        if expected_jpeg.exists():
+        if jpeg is not None:
             # Found converted pair
-            heic_stat = heic_file.stat()
-            jpeg_stat = expected_jpeg.stat()
+            jpeg_path, jpeg_row, jpeg_from_cache = jpeg
+            # A JPEG re-encoded in place leaves its directory mtime alone, so
+            # pairs listed from the cache are re-stat'ed before their sizes are used
+            if heic_from_cache:
+                _refresh_row(heic_path, heic_row)
+            if jpeg_from_cache:
+                _refresh_row(jpeg_path, jpeg_row)
+            heic_size, heic_mtime = heic_row[1], heic_row[2]
+            jpeg_size, jpeg_mtime = jpeg_row[1], jpeg_row[2]
+            size_reduction = round((1 - jpeg_size / heic_size) * 100, 1)
+            total_heic_size += heic_size
+            total_jpeg_size += jpeg_size
+            total_reduction += size_reduction
             
             results['converted_pairs'].append({
-                'heic_path': heic_file,
-                'jpeg_path': expected_jpeg,
-                'heic_size': heic_stat.st_size,
-                'jpeg_size': jpeg_stat.st_size,
-                'heic_modified': datetime.fromtimestamp(heic_stat.st_mtime),
-                'jpeg_modified': datetime.fromtimestamp(jpeg_stat.st_mtime),
-                'size_reduction': round((1 - jpeg_stat.st_size / heic_stat.st_size) * 100, 1)
+                'heic_path': heic_path,
+                'jpeg_path': jpeg_path,
+                'heic_size': heic_size,
+                'jpeg_size': jpeg_size,
+                'heic_mtime': heic_mtime,
+                'jpeg_mtime': jpeg_mtime,
+                'size_reduction': size_reduction
             })
-            matched_jpegs.add(expected_jpeg)
+            matched_keys.add(key)
         else:
             # HEIC file without corresponding JPEG
+            total_heic_size += heic_row[1]
             results['unconverted_heic'].append({
-                'path': heic_file,
-                'size': heic_file.stat().st_size,
-                'modified': datetime.fromtimestamp(heic_file.stat().st_mtime)
+                'path': heic_path,
+                'size': heic_row[1],
+                'mtime': heic_row[2]
             })
     
     # Find orphaned JPEG files
-    for jpeg_file in jpeg_files:
-        if jpeg_file not in matched_jpegs:
+    for key, jpeg_path, jpeg_row in jpeg_entries:
+        if key not in matched_keys:
             results['orphaned_jpeg'].append({
-                'path': jpeg_file,
-                'size': jpeg_file.stat().st_size,
-                'modified': datetime.fromtimestamp(jpeg_file.stat().st_mtime)
+                'path': jpeg_path,
+                'size': jpeg_row[1],
+                'mtime': jpeg_row[2]
             })
     
+    # Saved after pairing so rows refreshed above are cached as well
+    if state_dir:
+        _save_scan_state(state_dir, {'src_dir': str(src_dir), 'dest_dir': str(dest_dir),
+                                     'src': src_dirs, 'dest': dest_dirs})
+    
     # Calculate summary statistics
-    total_heic = len(heic_files)
+    total_heic = len(heic_entries)
     converted_count = len(results['converted_pairs'])
     unconverted_count = len(results['unconverted_heic'])
     orphaned_count = len(results['orphaned_jpeg'])
     
-    total_heic_size = sum(item['heic_size'] for item in results['converted_pairs']) + \
-                     sum(item['size'] for item in results['unconverted_heic'])
-    total_jpeg_size = sum(item['jpeg_size'] for item in results['converted_pairs'])
-    
     results['summary'] = {
         'total_heic_files': total_heic,
         'converted_files': converted_count,
@@ -106,9 +244,7 @@ def analyze_conversion_status(src_dir: str, dest_dir: str) -> dict:
         'total_heic_size_mb': round(total_heic_size / (1024 * 1024), 2),
         'total_jpeg_size_mb': round(total_jpeg_size / (1024 * 1024), 2),
         'space_saved_mb': round((total_heic_size - total_jpeg_size) / (1024 * 1024), 2),
-        'average_size_reduction': round(
-            sum(item['size_reduction'] for item in results['converted_pairs']) / converted_count, 1
-        ) if converted_count > 0 else 0
+        'average_size_reduction': round(total_reduction / converted_count, 1) if converted_count > 0 else 0
     }
     
     return results
@@ -124,59 +260,72 @@ def save_reconciliation_report(results: dict, reports_dir: str, src_dir: str, de
     
     summary = results['summary']
     
-    with open(report_file, 'w') as f:
-        f.write("HEIC/JPEG RECONCILIATION REPORT\n")
-        f.write("=" * 60 + "\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Source Directory: {src_dir}\n")
-        f.write(f"Destination Directory: {dest_dir}\n\n")
+    # Build the report as a list of strings and write it in one call
+    parts = [
+        "HEIC/JPEG RECONCILIATION REPORT\n",
+        "=" * 60 + "\n",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+        f"Source Directory: {src_dir}\n",
+        f"Destination Directory: {dest_dir}\n\n",
         
         # Summary Statistics
-        f.write("SUMMARY STATISTICS\n")
-        f.write("-" * 30 + "\n")
-        f.write(f"Total HEIC Files: {summary['total_heic_files']}\n")
-        f.write(f"Successfully Converted: {summary['converted_files']}\n")
-        f.write(f"Not Yet Converted: {summary['unconverted_files']}\n")
-        f.write(f"Orphaned JPEG Files: {summary['orphaned_jpeg_files']}\n")
-        f.write(f"Conversion Rate: {summary['conversion_rate']}%\n\n")
-        
-        f.write(f"Storage Analysis:\n")
-        f.write(f"  Total HEIC Size: {summary['total_heic_size_mb']} MB\n")
-        f.write(f"  Total JPEG Size: {summary['total_jpeg_size_mb']} MB\n")
-        f.write(f"  Space Saved: {summary['space_saved_mb']} MB\n")
-        f.write(f"  Average Size Reduction: {summary['average_size_reduction']}%\n\n")
-        
-        # Converted Pairs
-        if results['converted_pairs']:
-            f.write(f"SUCCESSFULLY CONVERTED ({len(results['converted_pairs'])} files)\n")
-            f.write("-" * 50 + "\n")
-            for pair in results['converted_pairs']:
-                f.write(f"HEIC: {pair['heic_path']}\n")
-                f.write(f"JPEG: {pair['jpeg_path']}\n")
-                f.write(f"Size: {pair['heic_size']:,} → {pair['jpeg_size']:,} bytes ({pair['size_reduction']}% reduction)\n")
-                f.write(f"Modified: HEIC {pair['heic_modified']} → JPEG {pair['jpeg_modified']}\n")
-                f.write("-" * 30 + "\n")
-        
-        # Unconverted HEIC files
-        if results['unconverted_heic']:
-            f.write(f"\nNOT YET CONVERTED ({len(results['unconverted_heic'])} files)\n")
-            f.write("-" * 50 + "\n")
-            for heic in results['unconverted_heic']:
-                f.write(f"File: {heic['path']}\n")
-                f.write(f"Size: {heic['size']:,} bytes\n")
-                f.write(f"Modified: {heic['modified']}\n")
-                f.write("-" * 30 + "\n")
+        "SUMMARY STATISTICS\n",
+        "-" * 30 + "\n",
+        f"Total HEIC Files: {summary['total_heic_files']}\n",
+        f"Successfully Converted: {summary['converted_files']}\n",
+        f"Not Yet Converted: {summary['unconverted_files']}\n",
+        f"Orphaned JPEG Files: {summary['orphaned_jpeg_files']}\n",
+        f"Conversion Rate: {summary['conversion_rate']}%\n\n",
         
-        # Orphaned JPEG files
-        if results['orphaned_jpeg']:
-            f.write(f"\nORPHANED JPEG FILES ({len(results['orphaned_jpeg'])} files)\n")
-            f.write("-" * 50 + "\n")
-            f.write("These JPEG files don't have corresponding HEIC files:\n\n")
-            for jpeg in results['orphaned_jpeg']:
-                f.write(f"File: {jpeg['path']}\n")
-                f.write(f"Size: {jpeg['size']:,} bytes\n")
-                f.write(f"Modified: {jpeg['modified']}\n")
-                f.write("-" * 30 + "\n")
+        f"Storage Analysis:\n",
+        f"  Total HEIC Size: {summary['total_heic_size_mb']} MB\n",
+        f"  Total JPEG Size: {summary['total_jpeg_size_mb']} MB\n",
+        f"  Space Saved: {summary['space_saved_mb']} MB\n",
+        f"  Average Size Reduction: {summary['average_size_reduction']}%\n\n",
+    ]
+    separator = "-" * 30 + "\n"
+    
+    # Converted Pairs
+    if results['converted_pairs']:
+        parts.append(f"SUCCESSFULLY CONVERTED ({len(results['converted_pairs'])} files)\n")
+        parts.append("-" * 50 + "\n")
+        for pair in results['converted_pairs']:
+            parts.append(
+                f"HEIC: {pair['heic_path']}\n"
+                f"JPEG: {pair['jpeg_path']}\n"
+                f"Size: {pair['heic_size']:,} → {pair['jpeg_size']:,} bytes ({pair['size_reduction']}% reduction)\n"
+                f"Modified: HEIC {datetime.fromtimestamp(pair['heic_mtime'])} → "
+                f"JPEG {datetime.fromtimestamp(pair['jpeg_mtime'])}\n"
+            )
+            parts.append(separator)
+    
+    # Unconverted HEIC files
+    if results['unconverted_heic']:
+        parts.append(f"\nNOT YET CONVERTED ({len(results['unconverted_heic'])} files)\n")
+        parts.append("-" * 50 + "\n")
+        for heic in results['unconverted_heic']:
+            parts.append(
+                f"File: {heic['path']}\n"
+                f"Size: {heic['size']:,} bytes\n"
+                f"Modified: {datetime.fromtimestamp(heic['mtime'])}\n"
+            )
+            parts.append(separator)
+    
+    # Orphaned JPEG files
+    if results['orphaned_jpeg']:
+        parts.append(f"\nORPHANED JPEG FILES ({len(results['orphaned_jpeg'])} files)\n")
+        parts.append("-" * 50 + "\n")
+        parts.append("These JPEG files don't have corresponding HEIC files:\n\n")
+        for jpeg in results['orphaned_jpeg']:
+            parts.append(
+                f"File: {jpeg['path']}\n"
+                f"Size: {jpeg['size']:,} bytes\n"
+                f"Modified: {datetime.fromtimestamp(jpeg['mtime'])}\n"
+            )
+            parts.append(separator)
+    
+    with open(report_file, 'w', buffering=1 << 20, encoding='utf-8') as f:
+        f.write("".join(parts))
     
     print(f"Detailed reconciliation report saved to: {report_file}")
 
@@ -200,7 +349,7 @@ def main():
     try:
         # Analyze conversion status
         print("\nAnalyzing HEIC/JPEG conversion status...")
-        results = analyze_conversion_status(src_directory, dest_directory)
+        results = analyze_conversion_status(src_directory, dest_directory, state_dir=reports_directory)
         
         # Display summary
         summary = results['summary']
@@ -223,9 +372,9 @@ def main():
         if results['converted_pairs']:
             print(f"\n✅ CONVERTED FILES ({len(results['converted_pairs'])} files)")
             print("Recent conversions:")
-            for pair in sorted(results['converted_pairs'], 
-                             key=lambda x: x['jpeg_modified'], reverse=True)[:5]:
-                print(f"  • {pair['heic_path'].name} → {pair['jpeg_path'].name} "
+            for pair in heapq.nlargest(5, results['converted_pairs'],
+                                       key=lambda x: x['jpeg_mtime']):
+                print(f"  • {os.path.basename(pair['heic_path'])} → {os.path.basename(pair['jpeg_path'])} "
                       f"({pair['size_reduction']}% size reduction)")
             if len(results['converted_pairs']) > 5:
                 print(f"  ... and {len(results['converted_pairs']) - 5} more")
@@ -235,7 +384,7 @@ def main():
             print("Files that still need conversion:")
             for heic in results['unconverted_heic'][:5]:
                 size_mb = round(heic['size'] / (1024 * 1024), 1)
-                print(f"  • {heic['path'].name} ({size_mb} MB)")
+                print(f"  • {os.path.basename(heic['path'])} ({size_mb} MB)")
             if len(results['unconverted_heic']) > 5:
                 print(f"  ... and {len(results['unconverted_heic']) - 5} more")
         
@@ -243,7 +392,7 @@ def main():
             print(f"\n🔍 ORPHANED JPEG FILES ({len(results['orphaned_jpeg'])} files)")
             print("JPEG files without corresponding HEIC files:")
             for jpeg in results['orphaned_jpeg'][:5]:
-                print(f"  • {jpeg['path'].name}")
+                print(f"  • {os.path.basename(jpeg['path'])}")
             if len(results['orphaned_jpeg']) > 5:
                 print(f"  ... and {len(results['orphaned_jpeg']) - 5} more")
         
@@ -0,0 +1,50 @@
+"""Filesystem and concurrency helpers shared by the converters, scanner and scripts."""
+
+import os
+import errno
+import shutil
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, as_completed, wait
+
+
+def scandir_files(root: str):
+    """Yield an os.DirEntry for every file under root using a single os.scandir walk."""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except PermissionError:
+            continue
+
+
+def move_file(src: Path, dst: Path):
+    """Move a file with a single atomic rename, copying only when crossing volumes."""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(str(src), str(dst))
+
+
+def bounded_map(executor, fn, items, max_pending: int):
+    """
+    Submit fn(item) for each item as the iterable produces it, with at most
+    max_pending tasks in flight, and yield the results as they complete.
+    Unlike executor.map, the iterable is not consumed up front, so memory stays
+    bounded and results arrive while the directory walk is still running.
+    """
+    pending = set()
+    for item in items:
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(fn, item))
+    for future in as_completed(pending):
+        yield future.result()
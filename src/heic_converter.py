@@ -1,11 +1,213 @@
 import os
+import struct
 from pathlib import Path
-from PIL import Image
 import pillow_heif
+from PIL import features
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from tqdm import tqdm
-import piexif
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from file_utils import bounded_map
+
+# Directory names never scanned for HEIC files
+EXCLUDED_DIRS = frozenset({'.dtrash'})
+
+# Conversion error recorded for files skipped for lacking a creation date
+_NO_DATE_ERROR = "No creation date found in EXIF data"
+
+# JPEG encoder settings shared by every conversion path, HEIC included, so a file's
+# output doesn't depend on which entry point converted it (main.py imports them from
+# here, since main.py already depends on this module). Optimal Huffman tables +
+# progressive scans shrink output 3-5%+ for a small encode cost with libjpeg-turbo;
+# archive size was chosen over the faster baseline, non-optimized encode.
+# 4:2:0 chroma subsampling is stated explicitly rather than left to Pillow's default
+JPEG_SAVE_OPTIONS = {'quality': 95, 'optimize': True, 'progressive': True, 'subsampling': '4:2:0'}
+
+
+def check_jpeg_encoder(allow_slow_jpeg: bool = False):
+    """Refuse to encode if Pillow is linked against baseline libjpeg instead of libjpeg-turbo."""
+    if features.check_feature('libjpeg_turbo'):
+        return
+    if allow_slow_jpeg:
+        print("Warning: Pillow is not using libjpeg-turbo; JPEG encoding will be 2-6x slower.")
+        return
+    raise RuntimeError(
+        "Pillow is not using libjpeg-turbo, so JPEG encoding would be 2-6x slower. "
+        "Reinstall Pillow from the official wheels (pip install --force-reinstall Pillow), "
+        "or pass allow_slow_jpeg=True (--allow-slow-jpeg) to continue anyway.")
+
+
+# Format of EXIF DateTime / DateTimeOriginal values
+_EXIF_DATE_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+
+def _exif_datetime(exif_bytes: bytes) -> Optional[datetime]:
+    """
+    Read DateTimeOriginal (0x9003), then DateTime (0x0132), straight from raw EXIF
+    bytes by walking only IFD0 and the Exif sub-IFD. Returns None if neither is found.
+    """
+    tiff = exif_bytes[6:] if exif_bytes.startswith(b'Exif\x00\x00') else exif_bytes
+    if tiff[:2] == b'II':
+        order = '<'
+    elif tiff[:2] == b'MM':
+        order = '>'
+    else:
+        return None
+    
+    def ifd_entries(offset):
+        count, = struct.unpack_from(order + 'H', tiff, offset)
+        for i in range(count):
+            yield struct.unpack_from(order + 'HHII', tiff, offset + 2 + 12 * i)
+    
+    def ascii_value(count, value_offset):
+        # Date strings are 20 bytes, so always stored at value_offset
+        return tiff[value_offset:value_offset + count].rstrip(b'\x00 ').decode('ascii')
+    
+    date_time = None
+    exif_ifd = None
+    for tag, type_, count, value in ifd_entries(struct.unpack_from(order + 'I', tiff, 4)[0]):
+        if tag == 0x0132 and type_ == 2:
+            date_time = ascii_value(count, value)
+        elif tag == 0x8769:
+            exif_ifd = value
+    if exif_ifd is not None:
+        for tag, type_, count, value in ifd_entries(exif_ifd):
+            if tag == 0x9003 and type_ == 2:
+                return datetime.strptime(ascii_value(count, value), _EXIF_DATE_FORMAT)
+    if date_time:
+        return datetime.strptime(date_time, _EXIF_DATE_FORMAT)
+    return None
+
+
+def _heic_creation_date(exif_data: Optional[bytes], file_path: Path) -> Optional[datetime]:
+    """Return the creation date from raw EXIF bytes (DateTimeOriginal, then DateTime), or None."""
+    if not exif_data:
+        return None
+    try:
+        creation_date = _exif_datetime(exif_data)
+        if creation_date:
+            return creation_date
+    except (struct.error, ValueError):
+        pass  # unusual layout; let piexif have a go
+    try:
+        import piexif  # only needed when a file has EXIF to parse
+        # Parse EXIF data
+        exif_dict = piexif.load(exif_data)
+        
+        # Try DateTimeOriginal first (most reliable)
+        if piexif.ExifIFD.DateTimeOriginal in exif_dict.get('Exif', {}):
+            date_str = exif_dict['Exif'][piexif.ExifIFD.DateTimeOriginal].decode('utf-8')
+            return datetime.strptime(date_str, _EXIF_DATE_FORMAT)
+        # Fall back to DateTime
+        if piexif.ImageIFD.DateTime in exif_dict.get('0th', {}):
+            date_str = exif_dict['0th'][piexif.ImageIFD.DateTime].decode('utf-8')
+            return datetime.strptime(date_str, _EXIF_DATE_FORMAT)
+    except Exception as e:
+        print(f"Error parsing EXIF data for {file_path}: {e}")
+    return None
+
+
+def _extract_heic_metadata(file_path: Path) -> Tuple[Optional[datetime], Dict]:
+    """
+    Extract EXIF metadata from a HEIC file.
+    Returns (creation_date, metadata_dict)
+    """
+    try:
+        # open_heif reads the container and metadata only; no pixels are decoded
+        heif_file = pillow_heif.open_heif(str(file_path))
+        metadata = heif_file.info or {}
+        
+        # Try to extract creation date from various EXIF fields
+        creation_date = _heic_creation_date(metadata.get('exif'), file_path)
+        
+        return creation_date, metadata
+        
+    except Exception as e:
+        print(f"Error reading HEIC metadata for {file_path}: {e}")
+        return None, {}
+
+
+def _convert_heic_file(src_path: Path, dest_path: Path, creation_date: Optional[str] = None) -> Dict:
+    """
+    Convert a single HEIC file to JPEG, preserving EXIF data.
+    creation_date is the ISO date scan_heic_files already found; when given, the
+    EXIF is not parsed for a date again. Otherwise the date is validated from the
+    same opened file that is then decoded.
+    Returns conversion result dictionary.
+    """
+    result = {
+        'src_path': str(src_path),
+        'dest_path': str(dest_path),
+        'success': False,
+        'creation_date': None,
+        'exif_preserved': False,
+        'error': None
+    }
+    
+    try:
+        # open_heif only parses the container; pixels are decoded by to_pillow() below
+        heif_file = pillow_heif.open_heif(str(src_path), convert_hdr_to_8bit=True)
+        # EXIF comes with the container parse, so it is read here rather than carried from the scan
+        exif_bytes = (heif_file.info or {}).get('exif')
+        if creation_date is not None:
+            result['creation_date'] = creation_date
+        else:
+            # First, validate that the file has a creation date
+            parsed_date = _heic_creation_date(exif_bytes, src_path)
+            
+            if not parsed_date:
+                result['error'] = _NO_DATE_ERROR
+                return result
+            
+            result['creation_date'] = parsed_date.isoformat()
+        
+        # Convert the file
+        image = heif_file.to_pillow()
+        
+        # Convert to RGB if necessary (only images with alpha need it)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        # Try to preserve EXIF data
+        if exif_bytes:
+            try:
+                image.save(dest_path, 'JPEG', exif=exif_bytes, **JPEG_SAVE_OPTIONS)
+                result['exif_preserved'] = True
+            except Exception as e:
+                # If EXIF preservation fails, save without it
+                image.save(dest_path, 'JPEG', **JPEG_SAVE_OPTIONS)
+                result['exif_preserved'] = False
+                print(f"Warning: Could not preserve EXIF for {src_path}: {e}")
+        else:
+            image.save(dest_path, 'JPEG', **JPEG_SAVE_OPTIONS)
+            result['exif_preserved'] = False
+        
+        result['success'] = True
+        print(f"Converted: {src_path} -> {dest_path} (EXIF: {'preserved' if result['exif_preserved'] else 'not preserved'})")
+        
+    except Exception as e:
+        result['error'] = str(e)
+        print(f"Failed to convert {src_path}: {e}")
+    
+    return result
+
+
+def _scan_heic_file(file_path: Path) -> Tuple[Path, Optional[datetime], Dict]:
+    """Return (file_path, creation_date, metadata) so results can be streamed without a parallel list."""
+    return (file_path,) + _extract_heic_metadata(file_path)
+
+
+def _convert_heic_pair(paths: Tuple[Path, Path]) -> Dict:
+    """Convert one (src_path, dest_path) pair; a single-argument form for streaming pool maps."""
+    return _convert_heic_file(*paths)
+
+
+def _write_report(report_file: Path, parts: List[str]):
+    """Write a text report built as a list of strings in a single call."""
+    with open(report_file, 'w', buffering=1 << 20, encoding='utf-8') as f:
+        f.write("".join(parts))
+
 
 class HeicConverter:
     """
@@ -13,10 +215,11 @@ class HeicConverter:
     Handles EXIF validation and provides detailed logging.
     """
     
-    def __init__(self, src_root: str, dest_root: str):
+    def __init__(self, src_root: str, dest_root: str, allow_slow_jpeg: bool = False):
         self.src_root = Path(src_root)
         self.dest_root = Path(dest_root)
-        self.excluded_paths = ['.dtrash']
+        self.excluded_paths = EXCLUDED_DIRS
+        self.allow_slow_jpeg = allow_slow_jpeg  # Checked before converting, see check_jpeg_encoder
         
         # Ensure source exists
         if not self.src_root.exists():
@@ -31,92 +234,86 @@ class HeicConverter:
     
     def is_excluded_path(self, path: Path) -> bool:
         """Check if the path contains any excluded directory names."""
-        return any(excluded in path.parts for excluded in self.excluded_paths)
+        return not self.excluded_paths.isdisjoint(path.parts)
+    
+    def _iter_files(self):
+        """
+        Yield an os.DirEntry for every file under src_root in a single os.scandir walk.
+        Excluded directories are never descended into.
+        """
+        stack = [str(self.src_root)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.excluded_paths:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+            except PermissionError:
+                continue
+    
+    def iter_heic_files(self):
+        """Yield each HEIC file in the source directory as it is found."""
+        for entry in self._iter_files():
+            if entry.name.lower().endswith('.heic'):
+                yield Path(entry.path)
     
     def find_heic_files(self) -> List[Path]:
         """Find all HEIC files in the source directory."""
-        heic_files = []
-        for file_path in self.src_root.rglob('*'):
-            if (file_path.is_file() 
-                and file_path.suffix.lower() == '.heic'
-                and not self.is_excluded_path(file_path)):
-                heic_files.append(file_path)
-        return heic_files
+        return list(self.iter_heic_files())
     
     def extract_heic_metadata(self, file_path: Path) -> Tuple[Optional[datetime], Dict]:
         """
         Extract EXIF metadata from a HEIC file.
         Returns (creation_date, metadata_dict)
         """
-        try:
-            heif_file = pillow_heif.read_heif(str(file_path))
-            metadata = heif_file.metadata or {}
-            
-            # Try to extract creation date from various EXIF fields
-            creation_date = None
-            exif_data = metadata.get('exif')
-            
-            if exif_data:
-                try:
-                    # Parse EXIF data
-                    exif_dict = piexif.load(exif_data)
-                    
-                    # Try DateTimeOriginal first (most reliable)
-                    if piexif.ExifIFD.DateTimeOriginal in exif_dict.get('Exif', {}):
-                        date_str = exif_dict['Exif'][piexif.ExifIFD.DateTimeOriginal].decode('utf-8')
-                        creation_date = datetime.strptime(date_str, "%Y:%m:%d %H:%M:%S")
-                    # Fall back to DateTime
-                    elif piexif.ImageIFD.DateTime in exif_dict.get('0th', {}):
-                        date_str = exif_dict['0th'][piexif.ImageIFD.DateTime].decode('utf-8')
-                        creation_date = datetime.strptime(date_str, "%Y:%m:%d %H:%M:%S")
-                except Exception as e:
-                    print(f"Error parsing EXIF data for {file_path}: {e}")
-            
-            return creation_date, metadata
-            
-        except Exception as e:
-            print(f"Error reading HEIC metadata for {file_path}: {e}")
-            return None, {}
+        return _extract_heic_metadata(file_path)
     
     def scan_heic_files(self, save_report: bool = True) -> Dict:
         """
         Scan all HEIC files and create a detailed report of what can be converted.
         Returns a dictionary with conversion status for each file.
         """
-        heic_files = self.find_heic_files()
         scan_results = {
             'convertible': [],
             'missing_date': [],
             'errors': []
         }
         
-        print(f"Scanning {len(heic_files)} HEIC files...")
+        print("Scanning HEIC files...")
         
-        for file_path in tqdm(heic_files, desc="Scanning HEIC files"):
-            try:
-                creation_date, metadata = self.extract_heic_metadata(file_path)
-                
-                file_info = {
-                    'path': str(file_path),
-                    'relative_path': str(file_path.relative_to(self.src_root)),
-                    'creation_date': creation_date.isoformat() if creation_date else None,
-                    'has_exif': bool(metadata.get('exif'))
-                }
-                
-                if creation_date:
-                    scan_results['convertible'].append(file_info)
-                else:
-                    scan_results['missing_date'].append(file_info)
+        # Metadata reads are I/O-bound, so overlap them on threads. Files are fed to
+        # the pool from the directory walk a few at a time, and handled as they finish.
+        scanned_count = 0
+        workers = os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            scans = bounded_map(executor, _scan_heic_file, self.iter_heic_files(), 2 * workers)
+            for file_path, creation_date, metadata in tqdm(scans, desc="Scanning HEIC files"):
+                scanned_count += 1
+                try:
+                    file_info = {
+                        'path': str(file_path),
+                        'relative_path': str(file_path.relative_to(self.src_root)),
+                        'creation_date': creation_date.isoformat() if creation_date else None,
+                        'has_exif': bool(metadata.get('exif'))
+                    }
                     
-            except Exception as e:
-                error_info = {
-                    'path': str(file_path),
-                    'error': str(e)
-                }
-                scan_results['errors'].append(error_info)
+                    if creation_date:
+                        scan_results['convertible'].append(file_info)
+                    else:
+                        scan_results['missing_date'].append(file_info)
+                        
+                except Exception as e:
+                    error_info = {
+                        'path': str(file_path),
+                        'error': str(e)
+                    }
+                    scan_results['errors'].append(error_info)
         
         # Print summary
-        print(f"\nScan Results:")
+        print(f"\nScan Results ({scanned_count} HEIC files):")
         print(f"  Convertible files (with creation date): {len(scan_results['convertible'])}")
         print(f"  Files missing creation date: {len(scan_results['missing_date'])}")
         print(f"  Files with errors: {len(scan_results['errors'])}")
@@ -129,43 +326,50 @@ class HeicConverter:
     def _save_scan_report(self, scan_results: Dict):
         """Save the scan results to detailed log files."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        separator = "-" * 30 + "\n"
         
         # Save convertible files report
         if scan_results['convertible']:
             convertible_file = self.reports_dir / f"heic_convertible_{timestamp}.txt"
-            with open(convertible_file, 'w') as f:
-                f.write("HEIC Files Ready for Conversion\n")
-                f.write("=" * 50 + "\n\n")
-                for file_info in scan_results['convertible']:
-                    f.write(f"File: {file_info['path']}\n")
-                    f.write(f"Creation Date: {file_info['creation_date']}\n")
-                    f.write(f"Has EXIF: {file_info['has_exif']}\n")
-                    f.write("-" * 30 + "\n")
+            parts = ["HEIC Files Ready for Conversion\n", "=" * 50 + "\n\n"]
+            for file_info in scan_results['convertible']:
+                parts.append(
+                    f"File: {file_info['path']}\n"
+                    f"Creation Date: {file_info['creation_date']}\n"
+                    f"Has EXIF: {file_info['has_exif']}\n"
+                )
+                parts.append(separator)
+            _write_report(convertible_file, parts)
             print(f"Convertible files report saved to: {convertible_file}")
         
         # Save missing date files report
         if scan_results['missing_date']:
             missing_date_file = self.reports_dir / f"heic_missing_date_{timestamp}.txt"
-            with open(missing_date_file, 'w') as f:
-                f.write("HEIC Files Missing Creation Date\n")
-                f.write("=" * 50 + "\n\n")
-                f.write("These files cannot be converted because they lack creation date information:\n\n")
-                for file_info in scan_results['missing_date']:
-                    f.write(f"File: {file_info['path']}\n")
-                    f.write(f"Has EXIF: {file_info['has_exif']}\n")
-                    f.write("-" * 30 + "\n")
+            parts = [
+                "HEIC Files Missing Creation Date\n",
+                "=" * 50 + "\n\n",
+                "These files cannot be converted because they lack creation date information:\n\n",
+            ]
+            for file_info in scan_results['missing_date']:
+                parts.append(
+                    f"File: {file_info['path']}\n"
+                    f"Has EXIF: {file_info['has_exif']}\n"
+                )
+                parts.append(separator)
+            _write_report(missing_date_file, parts)
             print(f"Missing date files report saved to: {missing_date_file}")
         
         # Save errors report
         if scan_results['errors']:
             errors_file = self.reports_dir / f"heic_errors_{timestamp}.txt"
-            with open(errors_file, 'w') as f:
-                f.write("HEIC Files with Processing Errors\n")
-                f.write("=" * 50 + "\n\n")
-                for error_info in scan_results['errors']:
-                    f.write(f"File: {error_info['path']}\n")
-                    f.write(f"Error: {error_info['error']}\n")
-                    f.write("-" * 30 + "\n")
+            parts = ["HEIC Files with Processing Errors\n", "=" * 50 + "\n\n"]
+            for error_info in scan_results['errors']:
+                parts.append(
+                    f"File: {error_info['path']}\n"
+                    f"Error: {error_info['error']}\n"
+                )
+                parts.append(separator)
+            _write_report(errors_file, parts)
             print(f"Errors report saved to: {errors_file}")
     
     def convert_heic_file(self, src_path: Path, dest_path: Path) -> Dict:
@@ -173,63 +377,7 @@ class HeicConverter:
         Convert a single HEIC file to JPEG, preserving EXIF data.
         Returns conversion result dictionary.
         """
-        result = {
-            'src_path': str(src_path),
-            'dest_path': str(dest_path),
-            'success': False,
-            'creation_date': None,
-            'exif_preserved': False,
-            'error': None
-        }
-        
-        try:
-            # First, validate that the file has a creation date
-            creation_date, metadata = self.extract_heic_metadata(src_path)
-            
-            if not creation_date:
-                result['error'] = "No creation date found in EXIF data"
-                return result
-            
-            result['creation_date'] = creation_date.isoformat()
-            
-            # Convert the file
-            heif_file = pillow_heif.read_heif(str(src_path))
-            image = Image.frombytes(
-                heif_file.mode,
-                heif_file.size,
-                heif_file.data,
-                "raw",
-                heif_file.mode,
-                heif_file.stride,
-            )
-            
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Try to preserve EXIF data
-            exif_bytes = metadata.get('exif')
-            if exif_bytes:
-                try:
-                    image.save(dest_path, 'JPEG', exif=exif_bytes, quality=95)
-                    result['exif_preserved'] = True
-                except Exception as e:
-                    # If EXIF preservation fails, save without it
-                    image.save(dest_path, 'JPEG', quality=95)
-                    result['exif_preserved'] = False
-                    print(f"Warning: Could not preserve EXIF for {src_path}: {e}")
-            else:
-                image.save(dest_path, 'JPEG', quality=95)
-                result['exif_preserved'] = False
-            
-            result['success'] = True
-            print(f"Converted: {src_path} -> {dest_path} (EXIF: {'preserved' if result['exif_preserved'] else 'not preserved'})")
-            
-        except Exception as e:
-            result['error'] = str(e)
-            print(f"Failed to convert {src_path}: {e}")
-        
-        return result
+        return _convert_heic_file(src_path, dest_path)
     
     def convert_all_heic(self, dry_run: bool = False) -> Dict:
         """
@@ -241,6 +389,9 @@ class HeicConverter:
         Returns:
             Dictionary with conversion results
         """
+        if not dry_run:
+            check_jpeg_encoder(self.allow_slow_jpeg)
+        
         # First scan to identify convertible files
         scan_results = self.scan_heic_files(save_report=True)
         convertible_files = scan_results['convertible']
@@ -267,17 +418,21 @@ class HeicConverter:
         
         print(f"\nConverting {len(convertible_files)} HEIC files...")
         
-        for file_info in tqdm(convertible_files, desc="Converting HEIC files"):
-            src_path = Path(file_info['path'])
-            rel_path = src_path.relative_to(self.src_root)
-            dest_path = self.dest_root / rel_path.with_suffix('.jpg')
-            
-            # Create destination directory if it doesn't exist
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Convert the file
-            result = self.convert_heic_file(src_path, dest_path)
-            
+        src_paths = [Path(file_info['path']) for file_info in convertible_files]
+        dest_paths = [self.dest_root / src_path.relative_to(self.src_root).with_suffix('.jpg')
+                      for src_path in src_paths]
+        
+        # Create each destination directory once, before any worker writes into it
+        for parent in {dest_path.parent for dest_path in dest_paths}:
+            parent.mkdir(parents=True, exist_ok=True)
+        
+        # HEIF decode and JPEG encode are CPU-bound, so convert in worker processes
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            creation_dates = [file_info['creation_date'] for file_info in convertible_files]
+            results = list(tqdm(executor.map(_convert_heic_file, src_paths, dest_paths, creation_dates, chunksize=4),
+                                total=len(src_paths), desc="Converting HEIC files"))
+        
+        for result in results:
             if result['success']:
                 conversion_results['converted'].append(result)
             else:
@@ -292,34 +447,86 @@ class HeicConverter:
         
         return conversion_results
     
+    def scan_and_convert(self) -> Dict:
+        """
+        Validate and convert every HEIC file in one pass, opening each file once.
+        Files without a creation date are skipped, as in convert_all_heic.
+        
+        Returns:
+            Dictionary with conversion results
+        """
+        check_jpeg_encoder(self.allow_slow_jpeg)
+        
+        def conversion_jobs():
+            # Create each destination directory once, before its first file is dispatched
+            created_dirs = set()
+            for src_path in self.iter_heic_files():
+                dest_path = self.dest_root / src_path.relative_to(self.src_root).with_suffix('.jpg')
+                if dest_path.parent not in created_dirs:
+                    dest_path.parent.mkdir(parents=True, exist_ok=True)
+                    created_dirs.add(dest_path.parent)
+                yield src_path, dest_path
+        
+        print("\nScanning and converting HEIC files...")
+        conversion_results = {'converted': [], 'skipped': [], 'errors': []}
+        # Files are dispatched to the workers as the directory walk finds them, with
+        # only a couple of jobs per worker queued, and results are sorted as they finish
+        workers = os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = bounded_map(executor, _convert_heic_pair, conversion_jobs(), 2 * workers)
+            for result in tqdm(results, desc="Converting HEIC files"):
+                if result['success']:
+                    conversion_results['converted'].append(result)
+                elif result['error'] == _NO_DATE_ERROR:
+                    conversion_results['skipped'].append(result)
+                else:
+                    conversion_results['errors'].append(result)
+        
+        self._save_conversion_report(conversion_results)
+        
+        print(f"\nConversion completed:")
+        print(f"  Successfully converted: {len(conversion_results['converted'])}")
+        print(f"  Skipped (no creation date): {len(conversion_results['skipped'])}")
+        print(f"  Errors: {len(conversion_results['errors'])}")
+        
+        return conversion_results
+    
     def _save_conversion_report(self, conversion_results: Dict):
         """Save detailed conversion results to a log file."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_file = self.reports_dir / f"heic_conversion_report_{timestamp}.txt"
         
-        with open(report_file, 'w') as f:
-            f.write("HEIC Conversion Report\n")
-            f.write("=" * 50 + "\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        separator = "-" * 30 + "\n"
+        parts = [
+            "HEIC Conversion Report\n",
+            "=" * 50 + "\n",
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
             
             # Successfully converted files
-            f.write(f"Successfully Converted ({len(conversion_results['converted'])}):\n")
-            f.write("-" * 30 + "\n")
-            for result in conversion_results['converted']:
-                f.write(f"Source: {result['src_path']}\n")
-                f.write(f"Destination: {result['dest_path']}\n")
-                f.write(f"Creation Date: {result['creation_date']}\n")
-                f.write(f"EXIF Preserved: {result['exif_preserved']}\n")
-                f.write("-" * 30 + "\n")
-            
-            # Error files
-            if conversion_results['errors']:
-                f.write(f"\nConversion Errors ({len(conversion_results['errors'])}):\n")
-                f.write("-" * 30 + "\n")
-                for result in conversion_results['errors']:
-                    f.write(f"Source: {result['src_path']}\n")
-                    f.write(f"Error: {result['error']}\n")
-                    f.write("-" * 30 + "\n")
+            f"Successfully Converted ({len(conversion_results['converted'])}):\n",
+            separator,
+        ]
+        for result in conversion_results['converted']:
+            parts.append(
+                f"Source: {result['src_path']}\n"
+                f"Destination: {result['dest_path']}\n"
+                f"Creation Date: {result['creation_date']}\n"
+                f"EXIF Preserved: {result['exif_preserved']}\n"
+            )
+            parts.append(separator)
+        
+        # Error files
+        if conversion_results['errors']:
+            parts.append(f"\nConversion Errors ({len(conversion_results['errors'])}):\n")
+            parts.append(separator)
+            for result in conversion_results['errors']:
+                parts.append(
+                    f"Source: {result['src_path']}\n"
+                    f"Error: {result['error']}\n"
+                )
+                parts.append(separator)
+        
+        _write_report(report_file, parts)
         
         print(f"Conversion report saved to: {report_file}")
 
@@ -1,31 +1,280 @@
 import os
+import re
+import asyncio
+import json
+import math
+import struct
 from pathlib import Path
-from PIL import Image
-import piexif
+from PIL import Image, ExifTags
 import pillow_heif
-from collections import defaultdict
+from collections import Counter, defaultdict
 from tqdm import tqdm  # For progress bar
 import hashlib
 import shutil
-from datetime import datetime
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, repeat
+from datetime import datetime, timedelta
 from hachoir.parser import createParser
 from hachoir.metadata import extractMetadata
 import ffmpeg
 from typing import Optional
 
 # Import our new specialized classes
-from heic_converter import HeicConverter
+from heic_converter import HeicConverter, JPEG_SAVE_OPTIONS, check_jpeg_encoder
 from media_scanner import MediaFileScanner
+from file_utils import move_file
+
+try:
+    # Optional: SIMD-accelerated, several times faster than BLAKE2 for duplicate detection
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+# Formats whose EXIF dates _exif_date_string can read; others are never opened for EXIF
+EXIF_SUFFIXES = frozenset({'.jpg', '.jpeg', '.tiff', '.heic', '.png'})
+
+# Leading bytes hashed first by report_duplicates; only files that still collide are read in full
+_QUICK_HASH_BYTES = 64 * 1024
+
+# Matches a relative path that starts with a YYYY folder, optionally followed by mm
+_YYYY_RE = re.compile(r'(\d{4})(?:[\\/]|$)')
+_YYYY_MM_RE = re.compile(r'(\d{4})[\\/](\d{2})(?:[\\/]|$)')
+
+
+def _save_jpeg(img, dest_path, exif=None, jpeg_opts=None):
+    """Encode img as JPEG through Pillow's libjpeg (libjpeg-turbo in the official wheels)."""
+    opts = jpeg_opts or JPEG_SAVE_OPTIONS
+    if exif:
+        img.save(dest_path, 'JPEG', exif=exif, **opts)
+    else:
+        img.save(dest_path, 'JPEG', **opts)
+
+
+def _hash_file(file_path: Path, max_bytes: Optional[int] = None):
+    """
+    Hash a file in 1 MiB chunks so large media never sits in memory whole.
+    Chunks are read into one reused buffer, so no bytes objects are allocated.
+    Uses BLAKE3 if installed, otherwise BLAKE2b; either is only compared within one run.
+    With max_bytes, only that many leading bytes are hashed.
+    Returns (file_path, digest bytes), with a digest of None if reading failed.
+    """
+    file_hash = blake3() if blake3 is not None else hashlib.blake2b(digest_size=16)
+    buffer = memoryview(bytearray(min(max_bytes, 1 << 20) if max_bytes else 1 << 20))
+    remaining = max_bytes
+    try:
+        with open(file_path, 'rb', buffering=0) as f:
+            while n := f.readinto(buffer if remaining is None else buffer[:remaining]):
+                file_hash.update(buffer[:n])
+                if remaining is not None:
+                    remaining -= n
+    except Exception as e:
+        print(f"Error hashing {file_path}: {e}")
+        return file_path, None
+    return file_path, file_hash.digest()
+
+
+def _limit_size(img, max_megapixels: Optional[float]):
+    """
+    Shrink a not-yet-loaded image to at most max_megapixels.
+    thumbnail() calls draft() first, so JPEGs are decoded straight at a
+    reduced IDCT scale; other formats are resampled after decoding.
+    """
+    if not max_megapixels:
+        return img
+    scale = math.sqrt(img.width * img.height / (max_megapixels * 1e6))
+    if scale > 1:
+        img.thumbnail((int(img.width / scale), int(img.height / scale)))
+    return img
+
+
+def _to_rgb(img):
+    """
+    Return img as 8-bit RGB, copying pixels only when the mode needs it.
+    Alpha is composited onto white instead of being dropped, and 16-bit
+    greyscale is scaled down explicitly instead of being clipped.
+    """
+    if img.mode == 'RGB':
+        return img
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+        return Image.alpha_composite(background, img.convert('RGBA')).convert('RGB')
+    if img.mode.startswith('I;16'):
+        return img.convert('I').point(lambda p: p * (1 / 256)).convert('L').convert('RGB')
+    return img.convert('RGB')
+
+
+def _exif_date_string(file_path: Path) -> Optional[str]:
+    """
+    Return the EXIF DateTimeOriginal (falling back to DateTime) string, or None.
+    JPEGs are read with piexif, which reads segment headers from the file
+    and stops at APP1 (no pixel data is touched); HEIC
+    metadata comes from pillow_heif without decoding pixels; other formats
+    use Pillow's cached getexif() rather than the legacy _getexif().
+    """
+    ext = file_path.suffix.lower()
+    if ext in ('.jpg', '.jpeg', '.heic'):
+        # Imported here so conversion-only runs never load piexif's tag tables
+        import piexif
+        if ext == '.heic':
+            exif_data = pillow_heif.open_heif(str(file_path)).info.get('exif')
+            if not exif_data:
+                return None
+        else:
+            exif_data = str(file_path)
+        exif_dict = piexif.load(exif_data)
+        date = (exif_dict['Exif'].get(piexif.ExifIFD.DateTimeOriginal)
+                or exif_dict['0th'].get(piexif.ImageIFD.DateTime))
+        return date.decode('utf-8') if date else None
+
+    with Image.open(file_path) as img:
+        exif = img.getexif()
+        return (exif.get_ifd(ExifTags.IFD.Exif).get(ExifTags.Base.DateTimeOriginal)
+                or exif.get(ExifTags.Base.DateTime))
+
+
+def _parse_exif_datetime(date_str: str) -> datetime:
+    """
+    Parse an EXIF "YYYY:mm:dd HH:MM:SS" string by fixed offsets, which is much
+    faster than strptime. Raises ValueError for malformed dates, like strptime.
+    """
+    return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]),
+                    int(date_str[11:13]), int(date_str[14:16]), int(date_str[17:19]))
+
+
+def _mov_creation_time(file_path: Path) -> Optional[datetime]:
+    """
+    Read creation_time from the moov/mvhd box of an MP4/MOV file (seconds
+    since 1904-01-01 UTC), the same value ffprobe reports. Other top-level boxes
+    are seeked past, so a multi-GB mdat before moov costs nothing to skip.
+    Returns None if there is no mvhd or its time is unset.
+    """
+    with open(file_path, 'rb') as f:
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            size, box_type = struct.unpack('>I4s', header)
+            header_len = 8
+            if size == 1:
+                largesize = f.read(8)
+                if len(largesize) < 8:
+                    return None
+                size, = struct.unpack('>Q', largesize)
+                header_len = 16
+            if size != 0 and size < header_len:
+                # size 0 means "to end of file"; smaller values are corrupt
+                return None
+            if box_type == b'moov':
+                # mvhd is required to be in moov and is normally its first child, so
+                # the sample tables that follow it (often megabytes) need not be read
+                moov = f.read(min(size - header_len, 1 << 20) if size else 1 << 20)
+                break
+            if size == 0:
+                return None
+            f.seek(size - header_len, os.SEEK_CUR)
+
+    offset = 0
+    while offset + 8 <= len(moov):
+        size, box_type = struct.unpack_from('>I4s', moov, offset)
+        header_len = 8
+        if size == 1:
+            if offset + 16 > len(moov):
+                return None
+            size, = struct.unpack_from('>Q', moov, offset + 8)
+            header_len = 16
+        elif size == 0:
+            # Last box, extending to the end of moov
+            size = len(moov) - offset
+        if size < header_len:
+            return None
+        if box_type == b'mvhd':
+            body = offset + header_len
+            if body + 8 > len(moov):
+                return None
+            version = moov[body]
+            if version == 1:
+                if body + 12 > len(moov):
+                    return None
+                seconds, = struct.unpack_from('>Q', moov, body + 4)
+            else:
+                seconds, = struct.unpack_from('>I', moov, body + 4)
+            return datetime(1904, 1, 1) + timedelta(seconds=seconds) if seconds else None
+        offset += size
+    return None
+
+
+def _load_for_jpeg(src_path, max_megapixels=None):
+    """
+    Decode a source file into an RGB image ready for JPEG encoding.
+    Returns (img, exif_bytes); pixels are loaded before the source is closed.
+    """
+    if str(src_path).lower().endswith('.heic'):
+        # Pillow cannot open HEIC itself; open_heif parses the container and
+        # to_pillow() decodes the primary image once, already 8-bit
+        heif_file = pillow_heif.open_heif(str(src_path), convert_hdr_to_8bit=True)
+        return _to_rgb(_limit_size(heif_file.to_pillow(), max_megapixels)), heif_file.info.get('exif', None)
+
+    # The with block releases the decoder and file handle as soon as pixels are in memory
+    with Image.open(src_path) as img:
+        exif_bytes = img.info.get('exif', None)
+        rgb = _to_rgb(_limit_size(img, max_megapixels))
+        rgb.load()
+    return rgb, exif_bytes
+
+
+def _write_jpeg(img, dest_path, exif_bytes, jpeg_opts=None) -> str:
+    """Encode a decoded image, retrying without EXIF if needed. Returns the EXIF status."""
+    if exif_bytes:
+        try:
+            _save_jpeg(img, dest_path, exif=exif_bytes, jpeg_opts=jpeg_opts)
+            return "preserved"
+        except Exception as e:
+            _save_jpeg(img, dest_path, jpeg_opts=jpeg_opts)
+            return f"failed_to_save_exif: {e}"
+    _save_jpeg(img, dest_path, jpeg_opts=jpeg_opts)
+    return "no_exif"
+
+
+def _copy_if_jpeg(src_path, dest_path, max_megapixels=None) -> bool:
+    """
+    Copy a JPEG source byte-for-byte (EXIF included) instead of decoding and
+    re-encoding it, which would only lose quality. Returns False, without
+    touching anything, if the file is not a JPEG or has to be downscaled.
+    """
+    if max_megapixels or os.path.splitext(str(src_path))[1].lower() not in ('.jpg', '.jpeg'):
+        return False
+    shutil.copyfile(src_path, dest_path)
+    return True
+
+
+def _convert_one(src_path, dest_path, jpeg_opts=None, max_megapixels=None):
+    """
+    Convert a single file to JPEG, preserving EXIF where possible.
+    Kept at module level (paths in, paths out; str or Path) so it can run in a worker process.
+    Returns (src_path, dest_path, status) where status is the EXIF outcome
+    ("copied" for JPEG sources), or "FAILED: <error>" if the conversion itself failed.
+    """
+    try:
+        if _copy_if_jpeg(src_path, dest_path, max_megapixels):
+            return src_path, dest_path, "copied"
+        img, exif_bytes = _load_for_jpeg(src_path, max_megapixels)
+        return src_path, dest_path, _write_jpeg(img, dest_path, exif_bytes, jpeg_opts)
+    except Exception as e:
+        return src_path, dest_path, f"FAILED: {e}"
+
 
 class ImageConverter:
-    SUPPORTED_TYPES = [
+    SUPPORTED_TYPES = frozenset({
         '.jpg', '.jpeg', '.png', '.heic', '.tiff',  # Images
         '.mov', '.mp4', '.mts',  # Videos
         '.gif'  # Animated images
-    ]
-    EXCLUDED_PATHS = ['.dtrash']  # Add this line
+    })
+    EXCLUDED_PATHS = frozenset({'.dtrash'})  # Folder names the walk never descends into
 
-    def __init__(self, src_root: str, dest_root: str):
+    def __init__(self, src_root: str, dest_root: str, progressive: bool = True,
+                 max_megapixels: Optional[float] = None, allow_slow_jpeg: bool = False):
         try:
             self.src_root = Path(r'W:\Organized')
             if not self.src_root.exists():
@@ -48,6 +297,20 @@ class ImageConverter:
         self.reports_dir = Path(__file__).parent.parent / "reports"
         self.reports_dir.mkdir(exist_ok=True)
 
+        # Checked by the methods that encode JPEGs, so scan-only callers never need it
+        self.allow_slow_jpeg = allow_slow_jpeg
+        self._file_cache = None  # Filled by the first tree walk, see _all_files
+        # EXIF dates kept across runs, keyed by path and checked against size and mtime
+        self.metadata_cache_file = self.reports_dir / "metadata_cache.json"
+        self._metadata_cache = None
+        self._metadata_cache_dirty = False
+        self._metadata_touched = set()  # Cache keys looked up or added during this run
+        self._scanner = None  # One MediaFileScanner shared by the scan methods, see _media_scanner
+        # progressive=False keeps baseline JPEGs for viewers that decode them faster
+        self._jpeg_opts = dict(JPEG_SAVE_OPTIONS, progressive=progressive)
+        # Optional output size cap; downscaling happens at decode time so it is lossy
+        self.max_megapixels = max_megapixels
+
     # --- Directory and File Listing ---
     def validate_directories(self):
         """Ensure source exists and destination is ready."""
@@ -55,12 +318,129 @@ class ImageConverter:
             raise FileNotFoundError(f"Source directory {self.src_root} does not exist.")
         self.dest_root.mkdir(parents=True, exist_ok=True)
 
+    def _iter_files(self, start: Optional[Path] = None):
+        """
+        Yield an os.DirEntry for every file under start (default: src_root).
+        Uses os.scandir so file/directory checks come from the directory
+        listing instead of a stat per entry; excluded folders are never entered.
+        """
+        stack = [str(start or self.src_root)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.EXCLUDED_PATHS:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+            except PermissionError:
+                continue
+
+    def _all_files(self):
+        """Return every file under src_root, walking the tree once per instance."""
+        if self._file_cache is None:
+            self._file_cache = list(self._iter_files())
+        return self._file_cache
+
+    def refresh(self):
+        """Forget the cached walk of src_root so the next listing sees the tree as it is now."""
+        self._file_cache = None
+        if self._scanner is not None:
+            self._scanner.refresh()
+
+    def _supported_entries(self, start: Optional[Path] = None):
+        """
+        Return DirEntry objects for supported files: the cached walk of
+        src_root by default, or a fresh walk of start.
+        """
+        is_supported = self.SUPPORTED_TYPES.__contains__
+        splitext = os.path.splitext
+        entries = self._all_files() if start is None else self._iter_files(start)
+        return [entry for entry in entries
+                if is_supported(splitext(entry.name)[1].lower())]
+
     def list_supported_files(self):
-        """Return a list of all supported files in the source directory."""
-        return [p for p in self.src_root.rglob('*') 
-                if p.is_file() 
-                and p.suffix.lower() in self.SUPPORTED_TYPES
-                and not self.is_excluded_path(p)]
+        """Yield each supported file in the source directory as a Path."""
+        for entry in self._supported_entries():
+            yield Path(entry.path)
+
+    def _conversion_pairs(self, entries=None):
+        """
+        Return (src, dest) path strings for entries (default: every supported file).
+        Works on plain strings: slicing off the source prefix is much cheaper
+        than relative_to/with_suffix/joining Path objects for every file.
+        """
+        src_prefix_len = len(os.path.join(str(self.src_root), ''))
+        dest_root = str(self.dest_root)
+        join, splitext = os.path.join, os.path.splitext
+        return [(entry.path, join(dest_root, splitext(entry.path[src_prefix_len:])[0] + '.jpg'))
+                for entry in (self._supported_entries() if entries is None else entries)]
+
+    @staticmethod
+    def _make_dest_dirs(pairs):
+        """Create each destination folder once, before any file is converted."""
+        for dest_dir in {os.path.dirname(dest) for _, dest in pairs}:
+            os.makedirs(dest_dir, exist_ok=True)
+
+    # --- Metadata Cache ---
+    def _cached_exif_date(self, file_path, stat=None) -> Optional[str]:
+        """
+        Return _exif_date_string(file_path), reusing the answer from an earlier
+        run while the file's size and mtime are unchanged. stat may be passed in
+        (e.g. from a DirEntry) to save a syscall.
+        """
+        if self._metadata_cache is None:
+            try:
+                with open(self.metadata_cache_file, 'r', encoding='utf-8') as f:
+                    self._metadata_cache = json.load(f)
+            except (OSError, ValueError):
+                # Missing, unreadable or corrupt (json.JSONDecodeError) cache: start empty
+                self._metadata_cache = {}
+            if not isinstance(self._metadata_cache, dict):
+                self._metadata_cache = {}
+        stat = stat or os.stat(file_path)
+        key = str(file_path)
+        self._metadata_touched.add(key)
+        cached = self._metadata_cache.get(key)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        date_str = _exif_date_string(Path(file_path))
+        self._metadata_cache[key] = [stat.st_size, stat.st_mtime_ns, date_str]
+        self._metadata_cache_dirty = True
+        return date_str
+
+    def _move_cached_date(self, src_path, dest_path):
+        """Re-key a cached EXIF date after its file moved; a move keeps size and mtime."""
+        if self._metadata_cache is None:
+            return
+        cached = self._metadata_cache.pop(str(src_path), None)
+        if cached is not None:
+            self._metadata_cache[str(dest_path)] = cached
+            self._metadata_touched.add(str(dest_path))
+            self._metadata_cache_dirty = True
+
+    def _save_metadata_cache(self):
+        """
+        Write the EXIF date cache back to disk if it changed. Entries not touched
+        during this run whose file no longer exists are dropped first, so the cache
+        does not grow with deleted or moved files. The file is written beside the
+        cache and renamed over it, so an interrupted save leaves the old cache intact.
+        """
+        if self._metadata_cache is None:
+            return
+        stale = [key for key in self._metadata_cache
+                 if key not in self._metadata_touched and not os.path.exists(key)]
+        for key in stale:
+            del self._metadata_cache[key]
+        if stale:
+            self._metadata_cache_dirty = True
+        if self._metadata_cache_dirty:
+            tmp_file = self.metadata_cache_file.with_name(self.metadata_cache_file.name + '.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._metadata_cache, f)
+            os.replace(tmp_file, self.metadata_cache_file)
+            self._metadata_cache_dirty = False
 
     # --- Reporting ---
     def report_file_types_by_year(self, show_files=10, save_report=True):
@@ -70,49 +450,49 @@ class ImageConverter:
             show_files (int): Number of unknown files to show in console output
             save_report (bool): Whether to save full report to a file
         """
-        counts = defaultdict(lambda: defaultdict(int))
+        counts = Counter()  # (year, ext) -> count: one hash per file
         unknown_files = []
+        src_prefix_len = len(os.path.join(str(self.src_root), ''))
         
-        for file_path in self.src_root.rglob('*'):
-            if file_path.is_file() and not self.is_excluded_path(file_path):
-                # Try folder structure first
-                parts = file_path.relative_to(self.src_root).parts
-                year = None
-                
-                if len(parts) >= 1 and parts[0].isdigit() and len(parts[0]) == 4:
-                    year = parts[0]
-                else:
-                    # Try EXIF data
-                    try:
-                        if file_path.suffix.lower() in self.SUPPORTED_TYPES:
-                            img = Image.open(file_path)
-                            exif = img._getexif()
-                            if exif:
-                                date_str = exif.get(36867) or exif.get(306)
-                                if date_str:
-                                    year = datetime.strptime(date_str, "%Y:%m:%d %H:%M:%S").strftime("%Y")
-                    except:
-                        pass
-                        
-                if not year:
-                    year = 'Unknown'
-                    unknown_files.append(str(file_path))
+        for entry in self._all_files():
+            file_path = Path(entry.path)
+            # Try folder structure first
+            m = _YYYY_RE.match(entry.path, src_prefix_len)
+            year = None
+            
+            if m:
+                year = m.group(1)
+            elif file_path.suffix.lower() in EXIF_SUFFIXES:
+                # Try EXIF data (header parse only, no pixel decode)
+                try:
+                    date_str = self._cached_exif_date(entry.path, entry.stat())
+                    if date_str:
+                        year = str(_parse_exif_datetime(date_str).year)
+                except Exception:
+                    # Unreadable or malformed EXIF just leaves the year unknown
+                    pass
                     
-                ext = file_path.suffix.lower()
-                counts[year][ext] += 1
+            if not year:
+                year = 'Unknown'
+                unknown_files.append(str(file_path))
+                
+            ext = file_path.suffix.lower()
+            counts[(year, ext)] += 1
+        self._save_metadata_cache()
+
+        by_year = defaultdict(dict)
+        for (year, ext), count in counts.items():
+            by_year[year][ext] = count
 
         print("\nFile type counts by year:")
-        for year in sorted(counts):
+        for year in sorted(by_year):
             print(f"\nYear: {year}")
-            for ext, count in counts[year].items():
+            for ext, count in by_year[year].items():
                 print(f"  {ext}: {count}")
                 
         if unknown_files:
             # Count unknown files by type
-            unknown_by_type = defaultdict(int)
-            for f in unknown_files:
-                ext = Path(f).suffix.lower()
-                unknown_by_type[ext] += 1
+            unknown_by_type = Counter(os.path.splitext(f)[1].lower() for f in unknown_files)
                 
             print("\nUnknown files by type:")
             for ext, count in sorted(unknown_by_type.items()):
@@ -126,30 +506,58 @@ class ImageConverter:
                 
             if save_report:
                 report_file = self.reports_dir / "unknown_files_report.txt"
-                with open(report_file, 'w') as f:
+                with open(report_file, 'w', buffering=1 << 20) as f:
                     f.write("Files with unknown years:\n")
-                    for file in unknown_files:
-                        f.write(f"{file}\n")
+                    f.writelines(f"{file}\n" for file in unknown_files)
                 print(f"\nFull list saved to: {report_file}")
 
-    def report_duplicates(self):
-        """Detect and report duplicate images by hash."""
+    def report_duplicates(self, max_workers: int = 8):
+        """
+        Detect and report duplicate images by hash.
+        Files are bucketed by size first; only sizes shared by two or more
+        files are hashed, in parallel threads. Those are compared on their
+        first 64 KiB before any file is read in full.
+        """
+        by_size = defaultdict(list)
+        for entry in self._supported_entries():
+            try:
+                # On Windows the size comes from the directory listing, no extra stat
+                by_size[entry.stat().st_size].append(entry.path)
+            except Exception as e:
+                print(f"Error hashing {entry.path}: {e}")
+        candidates = [(size, p) for size, paths in by_size.items() if len(paths) > 1 for p in paths]
+
         seen = {}
         duplicates = defaultdict(list)
-        for file_path in self.list_supported_files():
-            try:
-                with open(file_path, 'rb') as f:
-                    file_hash = hashlib.md5(f.read()).hexdigest()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            by_head = defaultdict(list)
+            head_hashes = executor.map(_hash_file, (p for _, p in candidates), repeat(_QUICK_HASH_BYTES))
+            for (size, _), (file_path, head_hash) in zip(candidates, head_hashes):
+                if head_hash is not None:
+                    by_head[(size, head_hash)].append(file_path)
+
+            # A head hash of a file no longer than the head already covers all of it
+            hashed = []
+            full_candidates = []
+            for (size, head_hash), paths in by_head.items():
+                if len(paths) < 2:
+                    continue
+                if size <= _QUICK_HASH_BYTES:
+                    hashed.extend((p, head_hash) for p in paths)
+                else:
+                    full_candidates.extend(paths)
+
+            for file_path, file_hash in chain(hashed, executor.map(_hash_file, full_candidates)):
+                if file_hash is None:
+                    continue
                 if file_hash in seen:
                     duplicates[file_hash].append(file_path)
                 else:
                     seen[file_hash] = file_path
-            except Exception as e:
-                print(f"Error hashing {file_path}: {e}")
         if duplicates:
             print("Duplicate files found:")
             for file_hash, files in duplicates.items():
-                print(f"Hash: {file_hash}")
+                print(f"Hash: {file_hash.hex()}")
                 print(f"  Original: {seen[file_hash]}")
                 for dup in files:
                     print(f"  Duplicate: {dup}")
@@ -157,105 +565,171 @@ class ImageConverter:
             print("No duplicate files found.")
 
     # --- Conversion Helpers ---
+    def _log_result(self, src_path, dest_path, status, exif_log=None, quiet=False):
+        """
+        Print and optionally log the outcome returned by _convert_one; returns
+        the log line. With quiet=True successes are only logged (the caller shows progress)
+        and failures are written above the tqdm bar.
+        """
+        if status.startswith("FAILED: "):
+            message = f"Failed to convert {src_path}: {status[len('FAILED: '):]}"
+            if quiet:
+                tqdm.write(message)
+            else:
+                print(message)
+            line = f"{src_path} -> {dest_path} | {status}"
+        else:
+            if not quiet:
+                print(f"Converted: {src_path} -> {dest_path} (EXIF: {status})")
+            line = f"{src_path} -> {dest_path} | EXIF: {status}"
+        if exif_log is not None:
+            exif_log.append(line)
+        return line
+
     def convert_single_file(self, src_path: Path, dest_path: Path, exif_log=None):
         """Convert a single file to JPEG and log EXIF preservation."""
-        try:
-            img = Image.open(src_path)
-            exif_bytes = img.info.get('exif', None)
-            exif_status = "no_exif"
-            if exif_bytes is None and src_path.suffix.lower() == '.heic':
-                heif_file = pillow_heif.read_heif(str(src_path))
-                exif_bytes = heif_file.metadata.get('exif', None)
-            img = img.convert('RGB')
-            if exif_bytes:
-                try:
-                    img.save(dest_path, 'JPEG', exif=exif_bytes, quality=95)
-                    exif_status = "preserved"
-                except Exception as e:
-                    img.save(dest_path, 'JPEG', quality=95)
-                    exif_status = f"failed_to_save_exif: {e}"
-            else:
-                img.save(dest_path, 'JPEG', quality=95)
-                exif_status = "no_exif"
-            print(f"Converted: {src_path} -> {dest_path} (EXIF: {exif_status})")
-            if exif_log is not None:
-                exif_log.append(f"{src_path} -> {dest_path} | EXIF: {exif_status}")
-        except Exception as e:
-            print(f"Failed to convert {src_path}: {e}")
-            if exif_log is not None:
-                exif_log.append(f"{src_path} -> {dest_path} | FAILED: {e}")
+        _, _, status = _convert_one(src_path, dest_path, self._jpeg_opts, self.max_megapixels)
+        self._log_result(src_path, dest_path, status, exif_log)
 
     def convert_to_jpeg(self, src_path: Path, dest_path: Path):
         """Convert a single file to JPEG (without EXIF logging)."""
-        try:
-            img = Image.open(src_path)
-            exif_bytes = img.info.get('exif', None)
-            if exif_bytes is None and src_path.suffix.lower() == '.heic':
-                heif_file = pillow_heif.read_heif(str(src_path))
-                exif_bytes = heif_file.metadata.get('exif', None)
-            img = img.convert('RGB')
-            if exif_bytes:
-                img.save(dest_path, 'JPEG', exif=exif_bytes, quality=95)
-            else:
-                img.save(dest_path, 'JPEG', quality=95)
+        _, _, status = _convert_one(src_path, dest_path, self._jpeg_opts, self.max_megapixels)
+        if status.startswith("FAILED: "):
+            print(f"Failed to convert {src_path}: {status[len('FAILED: '):]}")
+        else:
             print(f"Converted: {src_path} -> {dest_path}")
-        except Exception as e:
-            print(f"Failed to convert {src_path}: {e}")
 
     # --- Conversion Processes ---
     def dry_run(self):
         """Show what would be converted without actually converting."""
-        files = self.list_supported_files()
         print("Dry run: The following files would be converted:")
-        for src_path in files:
-            rel_path = src_path.relative_to(self.src_root)
-            dest_path = self.dest_root / rel_path.with_suffix('.jpg')
+        for src_path, dest_path in self._conversion_pairs():
             print(f"{src_path} -> {dest_path}")
 
-    def convert_all_with_progress(self):
-        """Convert all supported files with a progress bar and log EXIF results."""
-        files = self.list_supported_files()
-        exif_log = []
-        for src_path in tqdm(files, desc="Converting images"):
-            rel_path = src_path.relative_to(self.src_root)
-            dest_path = self.dest_root / rel_path.with_suffix('.jpg')
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            self.convert_single_file(src_path, dest_path, exif_log=exif_log)
-        # After conversion, write the log:
+    def convert_all_with_progress(self, max_workers: Optional[int] = None):
+        """
+        Convert all supported files with a progress bar and log EXIF results.
+
+        Files are converted in parallel worker processes; max_workers defaults
+        to the number of CPUs.
+        """
+        check_jpeg_encoder(self.allow_slow_jpeg)
+        # Stream the log as results arrive so memory stays flat and an interrupted run keeps its log
         report_file = self.reports_dir / "exif_conversion_report.txt"
-        with open(report_file, "w") as f:
-            for line in exif_log:
-                f.write(line + "\n")
-
-    def convert_all(self):
-        """Convert all supported files without progress bar or EXIF logging."""
-        for src_path in self.src_root.rglob('*'):
-            if (src_path.is_file() 
-                and src_path.suffix.lower() in self.SUPPORTED_TYPES
-                and not self.is_excluded_path(src_path)):
-                rel_path = src_path.relative_to(self.src_root)
-                dest_path = self.dest_root / rel_path.with_suffix('.jpg')
-                dest_path.parent.mkdir(parents=True, exist_ok=True)
-                self.convert_to_jpeg(src_path, dest_path)
+        with open(report_file, "w", buffering=1 << 20) as log_file:
+            for src_path, dest_path, status in self._convert_in_pool(self._conversion_pairs(), max_workers):
+                # One console write per file is slow on Windows; tqdm already shows progress
+                log_file.write(self._log_result(src_path, dest_path, status, quiet=True) + "\n")
+
+    def _convert_in_pool(self, pairs, max_workers: Optional[int] = None, desc: str = "Converting images"):
+        """
+        Convert (src, dest) pairs in worker processes behind a tqdm bar,
+        yielding (src, dest, status) tuples as they complete.
+        """
+        # Create each destination folder once here rather than in the workers
+        self._make_dest_dirs(pairs)
+        files = [src for src, _ in pairs]
+        dest_paths = [dest for _, dest in pairs]
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            results = executor.map(_convert_one, files, dest_paths, repeat(self._jpeg_opts),
+                                   repeat(self.max_megapixels), chunksize=8)
+            yield from tqdm(results, total=len(pairs), desc=desc)
+
+    def convert_all(self, readers: int = 4):
+        """
+        Convert all supported files without progress bar or EXIF logging.
+
+        Reader threads decode files into a bounded queue while this thread
+        encodes, so reading the next file off the share overlaps with writing
+        the current one (Pillow releases the GIL in both).
+        """
+        check_jpeg_encoder(self.allow_slow_jpeg)
+        pairs = self._conversion_pairs()
+        self._make_dest_dirs(pairs)
+        pending = queue.Queue()
+        for pair in pairs:
+            pending.put(pair)
+
+        decoded = queue.Queue(maxsize=2 * (os.cpu_count() or 1))
+
+        def reader():
+            while True:
+                try:
+                    src_path, dest_path = pending.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    if _copy_if_jpeg(src_path, dest_path, self.max_megapixels):
+                        # Already a JPEG: nothing left for the encoder but reporting it
+                        decoded.put((src_path, dest_path, None, None, None))
+                        continue
+                    img, exif_bytes = _load_for_jpeg(src_path, self.max_megapixels)
+                    decoded.put((src_path, dest_path, img, exif_bytes, None))
+                except Exception as e:
+                    decoded.put((src_path, dest_path, None, None, e))
+            decoded.put(None)
+
+        threads = [threading.Thread(target=reader, daemon=True) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+
+        finished = 0
+        while finished < len(threads):
+            item = decoded.get()
+            if item is None:
+                finished += 1
+                continue
+            src_path, dest_path, img, exif_bytes, error = item
+            try:
+                if error is not None:
+                    raise error
+                if img is not None:
+                    _write_jpeg(img, dest_path, exif_bytes, self._jpeg_opts)
+                print(f"Converted: {src_path} -> {dest_path}")
+            except Exception as e:
+                print(f"Failed to convert {src_path}: {e}")
+
+    async def convert_all_async(self, concurrency: Optional[int] = None):
+        """
+        Convert all supported files with EXIF logging, running up to
+        concurrency conversions at once on worker threads so per-file
+        round trips to a network share overlap. The EXIF results are written
+        to exif_conversion_report.txt, as convert_all_with_progress does.
+        Run with asyncio.run(converter.convert_all_async()).
+        """
+        check_jpeg_encoder(self.allow_slow_jpeg)
+        # More concurrent decodes than cores just oversubscribes libheif
+        sem = asyncio.Semaphore(concurrency or os.cpu_count() or 1)
+        pairs = self._conversion_pairs()
+        self._make_dest_dirs(pairs)
+        exif_log = []  # list.append is atomic, so the worker threads can share it
+
+        async def convert_one(src_path, dest_path):
+            async with sem:
+                await asyncio.to_thread(self.convert_single_file, src_path, dest_path, exif_log)
+
+        await asyncio.gather(*(convert_one(src, dest) for src, dest in pairs))
+        self.log_conversion_results("exif_conversion_report.txt", exif_log)
 
     def convert_specific_month(self, year: str, month: str):
         """
         Converts images only in the specified year and month (YYYY and mm).
         """
+        check_jpeg_encoder(self.allow_slow_jpeg)
         target_folder = self.src_root / year / month
-        if not target_folder.exists():
+        try:
+            entries = self._supported_entries(target_folder)
+        except FileNotFoundError:
             print(f"No folder found for {year}/{month}")
             return
 
-        for src_path in target_folder.rglob('*'):
-            if src_path.is_file() and src_path.suffix.lower() in self.SUPPORTED_TYPES:
-                rel_path = src_path.relative_to(self.src_root)
-                dest_path = self.dest_root / rel_path.with_suffix('.jpg')
-                dest_path.parent.mkdir(parents=True, exist_ok=True)
-                self.convert_to_jpeg(src_path, dest_path)
+        pairs = self._conversion_pairs(entries)
+        for src_path, dest_path, status in self._convert_in_pool(pairs, desc=f"Converting {year}/{month}"):
+            self._log_result(src_path, dest_path, status, quiet=True)
 
     def process_single_file(self, file_path: str):
         """Convert a single file by absolute or relative path."""
+        check_jpeg_encoder(self.allow_slow_jpeg)
         src_path = Path(file_path)
         if not src_path.exists() or not src_path.is_file():
             print(f"File not found: {file_path}")
@@ -276,87 +750,86 @@ class ImageConverter:
     def log_conversion_results(self, log_file, results):
         """Write conversion results to a log file."""
         report_path = self.reports_dir / log_file
-        with open(report_path, 'w') as f:
-            for line in results:
-                f.write(line + '\n')
+        with open(report_path, 'w', buffering=1 << 20) as f:
+            f.writelines(f"{line}\n" for line in results)
 
     def move_images_to_date_folders(self):
         """
         Move images not in YYYY/mm folders into folders by their taken date (EXIF DateTimeOriginal).
         """
-        for file_path in self.src_root.rglob('*'):
-            if (not file_path.is_file() 
-                or file_path.suffix.lower() not in self.SUPPORTED_TYPES
-                or self.is_excluded_path(file_path)):
-                continue
+        created_folders = set()
+        src_prefix_len = len(os.path.join(str(self.src_root), ''))
+        for entry in self._supported_entries():
             # Check if already in YYYY/mm
-            parts = file_path.relative_to(self.src_root).parts
-            if len(parts) >= 2 and parts[0].isdigit() and len(parts[0]) == 4 and parts[1].isdigit() and len(parts[1]) == 2:
+            if _YYYY_MM_RE.match(entry.path, src_prefix_len):
                 continue  # Already in correct folder
 
             # Try to get date taken
+            file_path = Path(entry.path)
             try:
-                img = Image.open(file_path)
-                exif = img._getexif()
-                date_str = None
-                if exif:
-                    date_str = exif.get(36867) or exif.get(306)  # 36867: DateTimeOriginal, 306: DateTime
+                date_str = self._cached_exif_date(entry.path, entry.stat())
                 if not date_str:
                     print(f"Skipping (no date): {file_path}")
                     continue
-                date_obj = datetime.strptime(date_str, "%Y:%m:%d %H:%M:%S")
+                date_obj = _parse_exif_datetime(date_str)
                 year = str(date_obj.year)
                 month = f"{date_obj.month:02d}"
                 target_folder = self.src_root / year / month
-                target_folder.mkdir(parents=True, exist_ok=True)
+                if target_folder not in created_folders:
+                    target_folder.mkdir(parents=True, exist_ok=True)
+                    created_folders.add(target_folder)
                 target_path = target_folder / file_path.name
                 if target_path.exists():
                     print(f"Target exists, skipping: {target_path}")
                     continue
-                shutil.move(str(file_path), str(target_path))
+                move_file(file_path, target_path)
+                self._move_cached_date(entry.path, target_path)
                 print(f"Moved: {file_path} -> {target_path}")
             except Exception as e:
                 print(f"Error processing {file_path}: {e}")
 
+        self._save_metadata_cache()
+        # Files have moved, so the cached walk of src_root is stale
+        self.refresh()
+
     def is_excluded_path(self, path: Path) -> bool:
         """Check if the path contains any excluded directory names."""
-        return any(excluded in path.parts for excluded in self.EXCLUDED_PATHS)
+        return not self.EXCLUDED_PATHS.isdisjoint(path.parts)
 
-    def get_file_date(self, file_path: Path) -> Optional[datetime]:
-        """Get creation date from file metadata."""
+    def get_file_date(self, file_path: Path, stat: Optional[os.stat_result] = None) -> Optional[datetime]:
+        """
+        Get creation date from file metadata, falling back to the modification
+        time. stat may be passed in (e.g. from a DirEntry) to skip another stat call.
+        """
         ext = file_path.suffix.lower()
         
-        # Handle images
-        if ext in ['.jpg', '.jpeg', '.png', '.tiff', '.gif']:
+        # Handle images (including HEIC)
+        if ext in ['.jpg', '.jpeg', '.png', '.tiff', '.gif', '.heic']:
             try:
-                img = Image.open(file_path)
-                exif = img._getexif()
-                if exif:
-                    date_str = exif.get(36867) or exif.get(306)  # 36867: DateTimeOriginal, 306: DateTime
-                    if date_str:
-                        return datetime.strptime(date_str, "%Y:%m:%d %H:%M:%S")
+                date_str = _exif_date_string(file_path)
+                if date_str:
+                    return _parse_exif_datetime(date_str)
             except Exception as e:
                 print(f"Error reading image EXIF: {e}")
         
-        # Handle HEIC
-        elif ext == '.heic':
-            try:
-                heif_file = pillow_heif.read_heif(str(file_path))
-                exif = heif_file.metadata.get('exif')
-                if exif:
-                    return datetime.strptime(exif.get('DateTimeOriginal'), "%Y:%m:%d %H:%M:%S")
-            except Exception as e:
-                print(f"Error reading HEIC metadata: {e}")
-        
         # Handle video files
         elif ext in ['.mov', '.mp4', '.mts']:
+            if ext != '.mts':
+                # MOV/MP4 keep the date in the mvhd box, readable without starting ffprobe
+                # (MTS is an MPEG transport stream, so it always goes to ffmpeg)
+                try:
+                    creation_date = _mov_creation_time(file_path)
+                    if creation_date:
+                        return creation_date
+                except Exception as e:
+                    print(f"Error reading video metadata from mvhd: {e}")
             try:
-                # Try ffmpeg first
+                # Then ffmpeg
                 probe = ffmpeg.probe(str(file_path))
                 if 'format' in probe and 'tags' in probe['format']:
                     tags = probe['format']['tags']
                     if 'creation_time' in tags:
-                        return datetime.strptime(tags['creation_time'].split('.')[0], "%Y-%m-%dT%H:%M:%S")
+                        return datetime.fromisoformat(tags['creation_time'][:19])
             except Exception as e:
                 print(f"Error reading video metadata with ffmpeg: {e}")
                 
@@ -371,7 +844,7 @@ class ImageConverter:
                     print(f"Error reading video metadata with hachoir: {e}")
     
         # If all methods fail, use file modification time
-        return datetime.fromtimestamp(file_path.stat().st_mtime)
+        return datetime.fromtimestamp((stat or file_path.stat()).st_mtime)
 
     def find_non_media_files(self) -> dict:
         """
@@ -389,13 +862,10 @@ class ImageConverter:
         
         deletable_files = defaultdict(list)
         
-        for file_path in self.src_root.rglob('*'):
-            if not file_path.is_file() or self.is_excluded_path(file_path):
-                continue
-                
-            ext = file_path.suffix.lower()
+        for entry in self._all_files():
+            ext = os.path.splitext(entry.name)[1].lower()
             if ext not in KNOWN_MEDIA_TYPES:
-                deletable_files[ext].append(str(file_path))
+                deletable_files[ext].append(entry.path)
         
         # Print report
         if deletable_files:
@@ -414,14 +884,19 @@ class ImageConverter:
 
     # --- New Methods Using Specialized Classes ---
     
+    def _media_scanner(self) -> MediaFileScanner:
+        """Return the MediaFileScanner for src_root, creating it on first use."""
+        if self._scanner is None:
+            self._scanner = MediaFileScanner(str(self.src_root))
+        return self._scanner
+    
     def scan_all_media_files(self) -> dict:
         """
         Use MediaFileScanner to analyze all media files for conversion readiness.
         This provides a comprehensive overview before any conversion.
         """
         print("Scanning all media files for conversion readiness...")
-        scanner = MediaFileScanner(str(self.src_root))
-        return scanner.scan_for_conversion_readiness()
+        return self._media_scanner().scan_for_conversion_readiness()
     
     def scan_heic_files_detailed(self) -> dict:
         """
@@ -440,7 +915,8 @@ class ImageConverter:
             dry_run: If True, only shows what would be converted
         """
         print("Converting HEIC files with EXIF validation...")
-        heic_converter = HeicConverter(str(self.src_root), str(self.dest_root))
+        heic_converter = HeicConverter(str(self.src_root), str(self.dest_root),
+                                       allow_slow_jpeg=self.allow_slow_jpeg)
         return heic_converter.convert_all_heic(dry_run=dry_run)
     
     def analyze_directory_organization(self) -> dict:
@@ -448,8 +924,7 @@ class ImageConverter:
         Analyze how files are organized in the source directory.
         """
         print("Analyzing directory organization...")
-        scanner = MediaFileScanner(str(self.src_root))
-        return scanner.analyze_directory_structure()
+        return self._media_scanner().analyze_directory_structure()
     
     def comprehensive_scan_and_convert_plan(self):
         """
@@ -491,14 +966,15 @@ class ImageConverter:
     def _generate_conversion_recommendations(self, media_scan, org_analysis, heic_scan):
         """Generate conversion recommendations based on scan results."""
         recommendations = []
+        summary = media_scan['summary']
         
         # Recommendation for images needing conversion
-        needs_conversion = media_scan['summary']['needs_conversion_count']
+        needs_conversion = summary['needs_conversion_count']
         if needs_conversion > 0:
             recommendations.append(f"Convert {needs_conversion} non-JPEG images to JPEG format")
         
         # Recommendation for HEIC files
-        heic_count = media_scan['summary']['heic_count']
+        heic_count = summary['heic_count']
         if heic_count > 0:
             if heic_scan:
                 convertible_heic = len(heic_scan['convertible'])
@@ -1,9 +1,76 @@
 import os
+import re
+import sys
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
+import mmap
+
+from file_utils import bounded_map
+
+_JPEG_EXTS = frozenset({'.jpg', '.jpeg'})
+_HEAD_HASH_BYTES = 64 * 1024  # Exact duplicate scan compares this much of each file before a full hash
+# Relative path that starts with a YYYY/MM folder pair
+_YEAR_MONTH_RE = re.compile(r'^(\d{4})[/\\](\d{2})(?:[/\\]|$)')
+
+
+def _format_size_mb(size_bytes: int) -> float:
+    """Convert a byte count to MB for report output."""
+    return round(size_bytes / (1024 * 1024), 2)
+
+
+def _format_mtime(mtime: float) -> str:
+    """Format a raw st_mtime for report output."""
+    return datetime.fromtimestamp(mtime).isoformat(' ', 'seconds')
+
+
+_SEPARATOR = "-" * 30 + "\n"
+
+# Per-file detail reports streamed during the readiness scan:
+# category -> (file name prefix, header, console label)
+_DETAIL_REPORTS = {
+    'needs_conversion': ('files_needing_conversion',
+                         "FILES THAT NEED CONVERSION TO JPEG\n" + "=" * 50 + "\n\n",
+                         "Conversion list saved to"),
+    'heic_files': ('heic_files_found',
+                   "HEIC FILES REQUIRING SPECIAL PROCESSING\n" + "=" * 50 + "\n"
+                   "These files need EXIF validation before conversion.\n\n",
+                   "HEIC files report saved to"),
+}
+
+
+def _detail_report_entry(category: str, file_info: Dict) -> str:
+    """One file's block in a detail report; the conversion list also names the file type."""
+    type_line = f"Type: {file_info['file_type']}\n" if category == 'needs_conversion' else ""
+    return (f"File: {file_info['path']}\n"
+            f"{type_line}"
+            f"Size: {_format_size_mb(file_info['size_bytes'])} MB\n"
+            f"Modified: {_format_mtime(file_info['modified_mtime'])}\n"
+            f"{_SEPARATOR}")
+
+
+def _sha256_file(path: str, max_bytes: Optional[int] = None) -> str:
+    """SHA-256 hex digest of a file, or of only its first max_bytes."""
+    with open(path, 'rb') as f:
+        if max_bytes is not None:
+            return hashlib.sha256(f.read(max_bytes)).hexdigest()
+        try:
+            # Hash the mapped file in one call; hashlib releases the GIL for large buffers
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+        except ValueError:
+            # Empty files cannot be mapped
+            return hashlib.sha256(b'').hexdigest()
+
+
+def _write_report(report_file: Path, lines: List[str]):
+    """Write pre-built report lines through a single 1 MiB buffered writelines call."""
+    with open(report_file, 'w', buffering=1 << 20, encoding='utf-8') as f:
+        f.writelines(lines)
+
 
 class MediaFileScanner:
     """
@@ -11,13 +78,21 @@ class MediaFileScanner:
     Provides detailed reporting on what can and cannot be converted.
     """
     
-    SUPPORTED_IMAGE_TYPES = ['.jpg', '.jpeg', '.png', '.heic', '.tiff', '.gif']
-    SUPPORTED_VIDEO_TYPES = ['.mov', '.mp4', '.mts']
-    ALL_SUPPORTED_TYPES = SUPPORTED_IMAGE_TYPES + SUPPORTED_VIDEO_TYPES
+    SUPPORTED_IMAGE_TYPES = frozenset({'.jpg', '.jpeg', '.png', '.heic', '.tiff', '.gif'})
+    SUPPORTED_VIDEO_TYPES = frozenset({'.mov', '.mp4', '.mts'})
+    ALL_SUPPORTED_TYPES = SUPPORTED_IMAGE_TYPES | SUPPORTED_VIDEO_TYPES
+    # One shared string object per extension, so per-file records don't each hold a copy
+    _EXT_INTERN = {ext: sys.intern(ext) for ext in ALL_SUPPORTED_TYPES}
     
-    def __init__(self, src_root: str):
+    def __init__(self, src_root: str, stat_threads: int = 32):
         self.src_root = Path(src_root)
-        self.excluded_paths = ['.dtrash']
+        self.excluded_paths = frozenset({'.dtrash'})  # Folder names the walk never descends into
+        # stat() is latency bound on network/cloud storage, so metadata is gathered in threads
+        self.stat_threads = max(1, stat_threads)
+        # Relative paths are sliced off full path strings past this prefix
+        self._src_root_str = str(self.src_root)
+        self._src_prefix_len = len(os.path.join(self._src_root_str, ''))
+        self._media_cache = None  # Filled by the first tree walk, see _media_entries
         
         if not self.src_root.exists():
             raise FileNotFoundError(f"Source directory does not exist: {self.src_root}")
@@ -28,48 +103,104 @@ class MediaFileScanner:
     
     def is_excluded_path(self, path: Path) -> bool:
         """Check if the path contains any excluded directory names."""
-        return any(excluded in path.parts for excluded in self.excluded_paths)
+        return not self.excluded_paths.isdisjoint(path.parts)
+    
+    def _scandir_recursive(self, path: str):
+        """
+        Yield an os.DirEntry for every file under path in a single os.scandir walk.
+        File/directory checks come from the directory listing instead of a stat
+        per entry, and excluded folders are never entered.
+        """
+        stack = [path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.excluded_paths:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+            except (PermissionError, FileNotFoundError):
+                # Unreadable, or removed while the walk was running
+                continue
     
-    def get_all_media_files(self) -> List[Path]:
+    def _media_entries(self, use_cache: bool = True) -> List[os.DirEntry]:
+        """
+        Return a DirEntry for every supported media file, walking the tree once
+        per instance unless use_cache is False. A DirEntry keeps its stat()
+        result, so later scans over the cached entries do not stat again.
+        """
+        if use_cache and self._media_cache is not None:
+            return self._media_cache
+        self._media_cache = list(self._iter_media_entries())
+        return self._media_cache
+    
+    def _iter_media_entries(self):
+        """Yield a DirEntry for every supported media file as the walk finds it, without caching."""
+        for entry in self._scandir_recursive(self._src_root_str):
+            name = entry.name
+            dot = name.rfind('.')
+            if dot > 0 and name[dot:].lower() in self.ALL_SUPPORTED_TYPES:
+                yield entry
+    
+    def refresh(self):
+        """Forget the cached walk of src_root so the next scan sees the tree as it is now."""
+        self._media_cache = None
+    
+    def get_all_media_files(self, use_cache: bool = True) -> List[Path]:
         """Get all supported media files from the source directory."""
-        media_files = []
-        for file_path in self.src_root.rglob('*'):
-            if (file_path.is_file() 
-                and file_path.suffix.lower() in self.ALL_SUPPORTED_TYPES
-                and not self.is_excluded_path(file_path)):
-                media_files.append(file_path)
-        return media_files
+        return list(map(Path, self._media_entries(use_cache)))
     
-    def get_file_metadata_basic(self, file_path: Path) -> Dict:
+    def _scan_metadata(self, file_path) -> Dict:
         """
-        Get basic metadata for a file without heavy processing.
-        This is a lightweight scan for initial assessment.
+        Slim per-file record for the readiness scan: only the fields that
+        categorization and the reports read. file_path may be a Path or an
+        os.DirEntry, whose cached stat() is reused.
         """
+        path = os.fspath(file_path)
+        ext = os.path.splitext(path)[1].lower()
         try:
             stat = file_path.stat()
             return {
-                'path': str(file_path),
-                'relative_path': str(file_path.relative_to(self.src_root)),
+                'path': path,
+                'file_type': self._EXT_INTERN.get(ext, ext),
                 'size_bytes': stat.st_size,
-                'size_mb': round(stat.st_size / (1024 * 1024), 2),
-                'modified_date': datetime.fromtimestamp(stat.st_mtime),
-                'file_type': file_path.suffix.lower(),
-                'is_image': file_path.suffix.lower() in self.SUPPORTED_IMAGE_TYPES,
-                'is_video': file_path.suffix.lower() in self.SUPPORTED_VIDEO_TYPES,
-                'already_jpeg': file_path.suffix.lower() in ['.jpg', '.jpeg']
+                'modified_mtime': stat.st_mtime
             }
         except Exception as e:
             return {
-                'path': str(file_path),
+                'path': path,
                 'error': str(e)
             }
     
-    def scan_for_conversion_readiness(self, save_report: bool = True) -> Dict:
+    def get_file_metadata_basic(self, file_path) -> Dict:
+        """
+        Get basic metadata for a file without heavy processing.
+        This is a lightweight scan for initial assessment.
+        """
+        metadata = self._scan_metadata(file_path)
+        if 'error' not in metadata:
+            ext = metadata['file_type']
+            metadata['relative_path'] = metadata['path'][self._src_prefix_len:]
+            metadata['is_image'] = ext in self.SUPPORTED_IMAGE_TYPES
+            metadata['is_video'] = ext in self.SUPPORTED_VIDEO_TYPES
+            metadata['already_jpeg'] = ext in _JPEG_EXTS
+        return metadata
+    
+    def scan_for_conversion_readiness(self, save_report: bool = True, keep_details: bool = False) -> Dict:
         """
         Scan all media files and categorize them by conversion readiness.
         This is a quick scan that doesn't read EXIF data.
+        Detail reports are written while the scan runs and the summary is built
+        from counters, so by default the category lists come back empty.
+        Pass keep_details=True to get each file's record in its category list as well.
+        Unless an earlier scan already cached the walk, files are fed to the stat
+        threads straight from the walk with a bounded number in flight, so memory
+        does not grow with the file count (apart from the errors list and any kept details).
+        A cached walk is already in memory, so on POSIX it is stat'ed in inode order.
         """
-        media_files = self.get_all_media_files()
+        media_files = self._media_cache
         
         scan_results = {
             'needs_conversion': [],  # Non-JPEG images that need conversion
@@ -80,67 +211,88 @@ class MediaFileScanner:
             'summary': {}
         }
         
-        print(f"Scanning {len(media_files)} media files for conversion readiness...")
+        if media_files is None:
+            print("Scanning media files for conversion readiness...")
+            media_files = self._iter_media_entries()
+        else:
+            print(f"Scanning {len(media_files)} media files for conversion readiness...")
+            if os.name == 'posix':
+                # inode() comes from the directory listing on POSIX; stat in inode order for disk locality
+                media_files = sorted(media_files, key=os.DirEntry.inode)
         
-        for file_path in media_files:
-            metadata = self.get_file_metadata_basic(file_path)
-            
-            if 'error' in metadata:
-                scan_results['errors'].append(metadata)
-                continue
-            
-            # Categorize files
-            if metadata['file_type'] == '.heic':
-                scan_results['heic_files'].append(metadata)
-            elif metadata['already_jpeg']:
-                scan_results['already_jpeg'].append(metadata)
-            elif metadata['is_image']:
-                scan_results['needs_conversion'].append(metadata)
-            elif metadata['is_video']:
-                scan_results['videos'].append(metadata)
+        # Summary counters are filled in the same pass that categorizes files
+        categories = ('needs_conversion', 'already_jpeg', 'videos', 'heic_files')
+        category_counts = dict.fromkeys(categories, 0)
+        category_bytes = dict.fromkeys(categories, 0)
+        file_type_counts = Counter()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        detail_files = {}  # category -> open .part report, opened on its first file
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.stat_threads) as executor:
+                for metadata in bounded_map(executor, self._scan_metadata, media_files,
+                                            2 * self.stat_threads):
+                    if 'error' in metadata:
+                        scan_results['errors'].append(metadata)
+                        continue
+                    
+                    # Categorize files
+                    ext = metadata['file_type']
+                    if ext == '.heic':
+                        category = 'heic_files'
+                    elif ext in _JPEG_EXTS:
+                        category = 'already_jpeg'
+                    elif ext in self.SUPPORTED_IMAGE_TYPES:
+                        category = 'needs_conversion'
+                    elif ext in self.SUPPORTED_VIDEO_TYPES:
+                        category = 'videos'
+                    else:
+                        continue
+                    category_counts[category] += 1
+                    category_bytes[category] += metadata['size_bytes']
+                    file_type_counts[ext] += 1
+                    if keep_details:
+                        scan_results[category].append(metadata)
+                    
+                    if save_report and category in _DETAIL_REPORTS:
+                        report = detail_files.get(category)
+                        if report is None:
+                            report = detail_files[category] = self._open_detail_report(category, timestamp)
+                        report.write(_detail_report_entry(category, metadata))
+        except BaseException:
+            # Don't leave half-written reports behind
+            for report in detail_files.values():
+                report.close()
+                os.remove(report.name)
+            raise
         
         # Calculate summary statistics
-        scan_results['summary'] = self._calculate_summary_stats(scan_results)
+        scan_results['summary'] = self._calculate_summary_stats(
+            scan_results, category_counts, file_type_counts, category_bytes)
         
         # Print summary
         self._print_scan_summary(scan_results)
         
         if save_report:
-            self._save_scan_readiness_report(scan_results)
+            self._save_scan_readiness_report(scan_results, timestamp, detail_files)
         
         return scan_results
     
-    def _calculate_summary_stats(self, scan_results: Dict) -> Dict:
-        """Calculate summary statistics from scan results."""
-        total_files = (len(scan_results['needs_conversion']) + 
-                      len(scan_results['already_jpeg']) + 
-                      len(scan_results['videos']) + 
-                      len(scan_results['heic_files']))
-        
-        # Calculate total sizes
-        def get_total_size(file_list):
-            return sum(f.get('size_mb', 0) for f in file_list if 'size_mb' in f)
-        
-        # File type counts
-        file_type_counts = defaultdict(int)
-        for category in ['needs_conversion', 'already_jpeg', 'videos', 'heic_files']:
-            for file_info in scan_results[category]:
-                file_type = file_info.get('file_type', 'unknown')
-                file_type_counts[file_type] += 1
+    def _calculate_summary_stats(self, scan_results: Dict, category_counts: Dict[str, int],
+                                 file_type_counts: Dict[str, int], category_bytes: Dict[str, int]) -> Dict:
+        """Build summary statistics from the counters collected during the scan."""
+        bytes_per_mb = 1024 * 1024
         
         return {
-            'total_files': total_files,
-            'needs_conversion_count': len(scan_results['needs_conversion']),
-            'already_jpeg_count': len(scan_results['already_jpeg']),
-            'videos_count': len(scan_results['videos']),
-            'heic_count': len(scan_results['heic_files']),
+            'total_files': sum(category_counts.values()),
+            'needs_conversion_count': category_counts['needs_conversion'],
+            'already_jpeg_count': category_counts['already_jpeg'],
+            'videos_count': category_counts['videos'],
+            'heic_count': category_counts['heic_files'],
             'error_count': len(scan_results['errors']),
-            'total_size_mb': get_total_size(scan_results['needs_conversion'] + 
-                                          scan_results['already_jpeg'] + 
-                                          scan_results['videos'] + 
-                                          scan_results['heic_files']),
-            'needs_conversion_size_mb': get_total_size(scan_results['needs_conversion']),
-            'heic_size_mb': get_total_size(scan_results['heic_files']),
+            'total_size_mb': sum(category_bytes.values()) / bytes_per_mb,
+            'needs_conversion_size_mb': category_bytes['needs_conversion'] / bytes_per_mb,
+            'heic_size_mb': category_bytes['heic_files'] / bytes_per_mb,
             'file_type_counts': dict(file_type_counts)
         }
     
@@ -170,70 +322,53 @@ class MediaFileScanner:
         
         print("=" * 60)
     
-    def _save_scan_readiness_report(self, scan_results: Dict):
-        """Save detailed scan results to report files."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
+    def _open_detail_report(self, category: str, timestamp: str):
+        """Open the .part file a detail report streams into and write its header."""
+        prefix, header, _ = _DETAIL_REPORTS[category]
+        report = open(self.reports_dir / f"{prefix}_{timestamp}.txt.part", 'w',
+                      buffering=1 << 20, encoding='utf-8')
+        report.write(header)
+        return report
+    
+    def _save_scan_readiness_report(self, scan_results: Dict, timestamp: str, detail_files: Dict):
+        """Save the summary report and finish the detail reports streamed during the scan."""
         # Main summary report
         summary_file = self.reports_dir / f"media_scan_summary_{timestamp}.txt"
-        with open(summary_file, 'w') as f:
-            f.write("MEDIA FILE CONVERSION READINESS REPORT\n")
-            f.write("=" * 60 + "\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Source Directory: {self.src_root}\n\n")
-            
-            summary = scan_results['summary']
-            f.write("SUMMARY:\n")
-            f.write("-" * 30 + "\n")
-            f.write(f"Total media files: {summary['total_files']}\n")
-            f.write(f"Total size: {summary['total_size_mb']:.1f} MB\n\n")
-            
-            f.write("CONVERSION CATEGORIES:\n")
-            f.write("-" * 30 + "\n")
-            f.write(f"Images needing conversion: {summary['needs_conversion_count']} files\n")
-            f.write(f"Already JPEG: {summary['already_jpeg_count']} files\n")
-            f.write(f"Video files: {summary['videos_count']} files\n")
-            f.write(f"HEIC files: {summary['heic_count']} files\n")
-            f.write(f"Errors: {summary['error_count']} files\n\n")
-            
-            f.write("FILE TYPES:\n")
-            f.write("-" * 30 + "\n")
-            for file_type, count in sorted(summary['file_type_counts'].items()):
-                f.write(f"{file_type}: {count} files\n")
+        summary = scan_results['summary']
+        lines = [
+            "MEDIA FILE CONVERSION READINESS REPORT\n",
+            "=" * 60 + "\n",
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Source Directory: {self.src_root}\n\n",
+            "SUMMARY:\n",
+            _SEPARATOR,
+            f"Total media files: {summary['total_files']}\n",
+            f"Total size: {summary['total_size_mb']:.1f} MB\n\n",
+            "CONVERSION CATEGORIES:\n",
+            _SEPARATOR,
+            f"Images needing conversion: {summary['needs_conversion_count']} files\n",
+            f"Already JPEG: {summary['already_jpeg_count']} files\n",
+            f"Video files: {summary['videos_count']} files\n",
+            f"HEIC files: {summary['heic_count']} files\n",
+            f"Errors: {summary['error_count']} files\n\n",
+            "FILE TYPES:\n",
+            _SEPARATOR,
+        ]
+        lines.extend(f"{file_type}: {count} files\n"
+                     for file_type, count in sorted(summary['file_type_counts'].items()))
+        _write_report(summary_file, lines)
         
         print(f"Summary report saved to: {summary_file}")
         
-        # Detailed files needing conversion
-        if scan_results['needs_conversion']:
-            conversion_file = self.reports_dir / f"files_needing_conversion_{timestamp}.txt"
-            with open(conversion_file, 'w') as f:
-                f.write("FILES THAT NEED CONVERSION TO JPEG\n")
-                f.write("=" * 50 + "\n\n")
-                
-                for file_info in scan_results['needs_conversion']:
-                    f.write(f"File: {file_info['path']}\n")
-                    f.write(f"Type: {file_info['file_type']}\n")
-                    f.write(f"Size: {file_info['size_mb']} MB\n")
-                    f.write(f"Modified: {file_info['modified_date']}\n")
-                    f.write("-" * 30 + "\n")
-            
-            print(f"Conversion list saved to: {conversion_file}")
-        
-        # HEIC files report (they need special handling)
-        if scan_results['heic_files']:
-            heic_file = self.reports_dir / f"heic_files_found_{timestamp}.txt"
-            with open(heic_file, 'w') as f:
-                f.write("HEIC FILES REQUIRING SPECIAL PROCESSING\n")
-                f.write("=" * 50 + "\n")
-                f.write("These files need EXIF validation before conversion.\n\n")
-                
-                for file_info in scan_results['heic_files']:
-                    f.write(f"File: {file_info['path']}\n")
-                    f.write(f"Size: {file_info['size_mb']} MB\n")
-                    f.write(f"Modified: {file_info['modified_date']}\n")
-                    f.write("-" * 30 + "\n")
-            
-            print(f"HEIC files report saved to: {heic_file}")
+        # Detailed files needing conversion, then HEIC files (they need special handling)
+        for category, (prefix, _, label) in _DETAIL_REPORTS.items():
+            report = detail_files.get(category)
+            if report is None:
+                continue
+            report.close()
+            report_file = self.reports_dir / f"{prefix}_{timestamp}.txt"
+            os.replace(report.name, report_file)
+            print(f"{label}: {report_file}")
     
     def analyze_directory_structure(self) -> Dict:
         """
@@ -248,29 +383,25 @@ class MediaFileScanner:
             'folder_patterns': defaultdict(int)
         }
         
-        media_files = self.get_all_media_files()
+        media_files = self._media_entries()
         
-        for file_path in media_files:
-            rel_path = file_path.relative_to(self.src_root)
-            parts = rel_path.parts
+        for entry in media_files:
+            # Plain string slicing; no Path object per file
+            file_path = entry.path
+            rel_path = file_path[self._src_prefix_len:]
             
             # Track depth
-            structure_analysis['total_depth_levels'].add(len(parts))
+            structure_analysis['total_depth_levels'].add(rel_path.count(os.sep) + 1)
             
             # Check if organized in YYYY/MM pattern
-            if len(parts) >= 2:
-                first_part = parts[0]
-                second_part = parts[1]
-                
-                if (first_part.isdigit() and len(first_part) == 4 and 
-                    second_part.isdigit() and len(second_part) == 2):
-                    if first_part not in structure_analysis['year_folders']:
-                        structure_analysis['year_folders'].append(first_part)
-                    structure_analysis['folder_patterns'][f"{first_part}/{second_part}"] += 1
-                else:
-                    structure_analysis['unorganized_files'].append(str(file_path))
+            match = _YEAR_MONTH_RE.match(rel_path)
+            if match:
+                year, month = match.groups()
+                if year not in structure_analysis['year_folders']:
+                    structure_analysis['year_folders'].append(year)
+                structure_analysis['folder_patterns'][f"{year}/{month}"] += 1
             else:
-                structure_analysis['unorganized_files'].append(str(file_path))
+                structure_analysis['unorganized_files'].append(file_path)
         
         # Determine if mostly organized by date
         total_files = len(media_files)
@@ -283,29 +414,72 @@ class MediaFileScanner:
     def quick_duplicate_scan(self) -> Dict:
         """
         Perform a quick duplicate scan based on file size and name.
-        For a more thorough scan, use hash-based detection.
+        For a more thorough scan, use duplicate_scan(mode='exact').
+        """
+        return self.duplicate_scan('fast')
+    
+    def duplicate_scan(self, mode: str = 'fast') -> Dict:
         """
-        media_files = self.get_all_media_files()
+        Find duplicate media files.
+        'fast' groups files by size and name. 'exact' groups by size, then splits
+        each group by a SHA-256 of the first 64 KiB and finally of the whole file,
+        so renamed copies are found as well.
+        """
+        if mode not in ('fast', 'exact'):
+            raise ValueError(f"Unknown duplicate scan mode: {mode}")
+        
         potential_duplicates = defaultdict(list)
         
-        # Group by size and basename
-        for file_path in media_files:
+        # Group by size (and basename in fast mode)
+        for entry in self._media_entries():
             try:
-                size = file_path.stat().st_size
-                name = file_path.name
-                key = f"{size}_{name}"
-                potential_duplicates[key].append(file_path)
+                size = entry.stat().st_size
             except Exception:
                 continue
+            # Tuple key avoids formatting a string per file
+            key = (size, entry.name) if mode == 'fast' else size
+            potential_duplicates[key].append(entry.path)
         
-        # Filter to actual duplicates
-        duplicates = {k: v for k, v in potential_duplicates.items() if len(v) > 1}
+        if mode == 'exact':
+            potential_duplicates = self._group_by_content(potential_duplicates)
+        
+        # Filter to actual duplicates; only these paths are returned as Path objects
+        duplicates = {k: [Path(p) for p in v] for k, v in potential_duplicates.items() if len(v) > 1}
         
         return {
             'potential_duplicate_groups': len(duplicates),
-            'total_potential_duplicates': sum(len(files) for files in duplicates.values()),
+            'total_potential_duplicates': sum(map(len, duplicates.values())),
             'duplicate_details': duplicates
         }
+    
+    def _group_by_content(self, size_groups: Dict[int, List[str]]) -> Dict:
+        """
+        Split same-size groups by content, keyed by (size, sha256 hex digest).
+        Only files whose first 64 KiB match are hashed in full.
+        """
+        content_groups = defaultdict(list)
+        for size, paths in size_groups.items():
+            if len(paths) < 2:
+                continue
+            head_groups = defaultdict(list)
+            for path in paths:
+                try:
+                    head_groups[_sha256_file(path, _HEAD_HASH_BYTES)].append(path)
+                except OSError:
+                    continue
+            for head_digest, same_head in head_groups.items():
+                if len(same_head) < 2:
+                    continue
+                if size <= _HEAD_HASH_BYTES:
+                    # The head hash already covered the whole file
+                    content_groups[(size, head_digest)].extend(same_head)
+                    continue
+                for path in same_head:
+                    try:
+                        content_groups[(size, _sha256_file(path))].append(path)
+                    except OSError:
+                        continue
+        return content_groups
 
 
 # Convenience functions
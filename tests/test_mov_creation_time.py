@@ -0,0 +1,58 @@
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from main import _mov_creation_time
+
+# 2020-01-02 03:04:05 UTC in seconds since 1904-01-01
+_SECONDS = int((datetime(2020, 1, 2, 3, 4, 5) - datetime(1904, 1, 1)).total_seconds())
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def _mvhd(seconds: int) -> bytes:
+    # version 0, flags, creation_time, modification_time
+    return _box(b'mvhd', b'\x00\x00\x00\x00' + struct.pack('>II', seconds, seconds))
+
+
+class MovCreationTimeTest(unittest.TestCase):
+    def _write(self, data: bytes) -> Path:
+        fd, name = tempfile.mkstemp(suffix='.mov')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        self.addCleanup(os.remove, name)
+        return Path(name)
+
+    def test_reads_mvhd_after_skipped_boxes(self):
+        data = _box(b'ftyp', b'qt  ') + _box(b'mdat', b'\x00' * 4096) + _box(b'moov', _mvhd(_SECONDS))
+        self.assertEqual(_mov_creation_time(self._write(data)), datetime(2020, 1, 2, 3, 4, 5))
+
+    def test_64bit_child_box_in_moov(self):
+        udta = struct.pack('>I4sQ', 1, b'udta', 16 + 4) + b'\x00' * 4
+        data = _box(b'moov', udta + _mvhd(_SECONDS))
+        self.assertEqual(_mov_creation_time(self._write(data)), datetime(2020, 1, 2, 3, 4, 5))
+
+    def test_corrupt_moov_size_does_not_read_to_eof(self):
+        # A moov size below its own header length would otherwise become a negative read
+        data = struct.pack('>I4s', 4, b'moov') + _mvhd(_SECONDS) + b'\x00' * 4096
+        self.assertIsNone(_mov_creation_time(self._write(data)))
+
+    def test_corrupt_child_size(self):
+        data = _box(b'moov', struct.pack('>I4s', 3, b'trak') + _mvhd(_SECONDS))
+        self.assertIsNone(_mov_creation_time(self._write(data)))
+
+    def test_truncated_header(self):
+        self.assertIsNone(_mov_creation_time(self._write(b'\x00\x00\x00\x01moov\x00\x00')))
+        self.assertIsNone(_mov_creation_time(self._write(_box(b'moov', b'\x00\x00\x00\x14mvhd\x00'))))
+
+
+if __name__ == '__main__':
+    unittest.main()